@@ -0,0 +1,126 @@
+"""Adaptive sampling of sweeps: refine where the bounds bend or cross the reference protocols."""
+
+import numpy as np
+from calculations.results import DERIVED_KEYS, OUTPUT_KEYS, compute_results
+
+
+# Pairs of outputs whose crossings are located up to the minimum interval width
+CROSSING_PAIRS = (
+    ("recall_ai_best_case", "recall_abbr"),
+    ("recall_ai_worst_case", "recall_abbr"),
+    ("recall_ai_best_case", "recall_full"),
+    ("recall_ai_worst_case", "recall_full"),
+    ("avg_time_ai_best_case", "avg_time_abbr"),
+    ("avg_time_ai_worst_case", "avg_time_abbr"),
+    ("avg_time_ai_best_case", "avg_time_full"),
+    ("avg_time_ai_worst_case", "avg_time_full"),
+)
+
+
+def _crossings(data, left, right):
+    """Return a mask of the intervals (left[i], right[i]) in which any pair in CROSSING_PAIRS crosses."""
+    crossed = np.zeros(len(left), dtype=bool)
+    for key, reference in CROSSING_PAIRS:
+        diff = data[key] - data[reference]
+        crossed |= np.sign(diff[left]) != np.sign(diff[right])
+    return crossed
+
+
+def adaptive_sample(
+    changing_param,
+    start,
+    end,
+    performance_params,
+    tolerance=1e-3,
+    max_points=100,
+    initial_points=9,
+    min_width=None,
+    dtype="float64",
+    compact=False,
+    backend=None,
+):
+    """
+    Sample a sweep with more points where the bounds change slope or cross a reference protocol.
+
+    The sweep starts on a uniform grid. Every interval is split at its midpoint for as long as
+    the outputs at the midpoint deviate from the straight line between the interval ends by more
+    than tolerance, or any adaptive bound crosses the abbreviated or full protocol within it.
+    Straight segments are therefore covered by a few points, while kinks (from the min/max in
+    process_parameter_set) and crossovers are located up to min_width.
+
+    Parameters
+    ----------
+    changing_param : str
+        Name of the parameter being varied in the analysis
+    start : float
+        First value of the sweep
+    end : float
+        Last value of the sweep
+    performance_params : dict
+        Dictionary containing the fixed performance parameters
+    tolerance : float, optional
+        Maximum deviation from linear interpolation, relative to the largest absolute value
+        of each output, by default 1e-3
+    max_points : int, optional
+        Maximum number of evaluated points, by default 100
+    initial_points : int, optional
+        Number of points of the initial uniform grid, by default 9
+    min_width : float, optional
+        Intervals narrower than this are not split, by default (end - start) * 1e-4
+    dtype : str or numpy.dtype, optional
+        Data type of the returned outputs, by default 'float64'
+    compact : bool, optional
+        If True, constant and derived outputs are not returned, by default False
+    backend : {'auto', 'numpy', 'numba'}, optional
+        Implementation of the bound calculation, by default the default backend
+        (see calculations.backends.resolve_backend)
+
+    Returns
+    -------
+    dict
+        Results at every evaluated point in increasing order of the changing parameter,
+        in the same form as calculations.results.compute_results
+    """
+    if min_width is None:
+        min_width = (end - start) * 1e-4
+    initial_values = np.linspace(start, end, min(initial_points, max_points))
+    data = compute_results(changing_param, initial_values, performance_params, backend=backend)
+    # Priority of every interval for splitting, the last known midpoint error
+    priority = np.full(data[changing_param].size - 1, np.inf)
+
+    while True:
+        x = data[changing_param]
+        candidates = np.flatnonzero((priority > 0) & (np.diff(x) > min_width))
+        budget = max_points - x.size
+        if candidates.size == 0 or budget <= 0:
+            break
+        if candidates.size > budget:
+            candidates = np.sort(candidates[np.argsort(-priority[candidates], kind="stable")[:budget]])
+
+        # Evaluate the midpoints and compare them with linear interpolation
+        mid_values = (x[candidates] + x[candidates + 1]) / 2
+        mid_data = compute_results(changing_param, mid_values, performance_params, backend=backend)
+        error = np.zeros(candidates.size)
+        for key in OUTPUT_KEYS:
+            scale = np.max(np.abs(data[key]))
+            if scale > 0:
+                interpolated = (data[key][candidates] + data[key][candidates + 1]) / 2
+                error = np.maximum(error, np.abs(mid_data[key] - interpolated) / scale)
+        split = error > tolerance
+
+        # Insert the midpoints and split the priorities of the refined intervals
+        positions = candidates + 1
+        data = {key: np.insert(data[key], positions, mid_data[key]) for key in data}
+        left = np.where(split, error, 0.0)
+        priority[candidates] = left
+        priority = np.insert(priority, positions, left)
+        new_left = candidates + np.arange(candidates.size)
+        for intervals in (new_left, new_left + 1):
+            crossed = _crossings(data, intervals, intervals + 1)
+            priority[intervals[crossed]] = np.inf
+
+    return {
+        key: values if key == changing_param else values.astype(dtype)
+        for key, values in data.items()
+        if not (compact and key in DERIVED_KEYS)
+    }
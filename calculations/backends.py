@@ -0,0 +1,216 @@
+"""Interchangeable implementations of the per-point bound calculation, selected at runtime."""
+
+import os
+import warnings
+import numpy as np
+from calculations.calculations import calculate_confusion_matrix
+from calculations.process_parameters import process_parameter_set
+
+# Numba is optional: without it, the NumPy backend is used
+try:
+    import numba
+except ImportError:
+    numba = None
+
+
+# Environment variable that sets the default backend
+BACKEND_ENV_VAR = "ADAPTIVE_MRI_BOUNDS_BACKEND"
+
+# Inputs of the fused kernel, in argument order
+KERNEL_INPUTS = (
+    "sensitivity_abbr",
+    "specificity_abbr",
+    "sensitivity_ai",
+    "specificity_ai",
+    "prevalence",
+    "full_time",
+    "abbr_time",
+)
+
+# Outputs of the fused kernel, in row order. The other outputs do not depend on the AI model,
+# so they are calculated on the broadcast shape of their own inputs and returned as views.
+KERNEL_OUTPUTS = (
+    "recall_ai_best_case",
+    "recall_ai_worst_case",
+    "avg_time_ai_best_case",
+    "avg_time_ai_worst_case",
+)
+
+# Number of consecutive points handled by one task of the fused kernel
+KERNEL_BLOCK = 4096
+
+_default_backend = os.environ.get(BACKEND_ENV_VAR, "numpy")
+
+
+if numba is not None:
+
+    @numba.njit(parallel=True, cache=True)
+    def _fused_kernel(sens_abbr, spec_abbr, sens_ai, spec_ai, prevalence, full_time, abbr_time, strides, shape, out):
+        """Calculate the AI outputs of process_parameter_set for every point of the broadcast shape."""
+        ndim = shape.size
+        n_inputs = strides.shape[0]
+        size = out.shape[1]
+        # Number of points spanned by one step along every axis, in C order
+        pitches = np.ones_like(shape)
+        for axis in range(ndim - 2, -1, -1):
+            pitches[axis] = pitches[axis + 1] * shape[axis + 1]
+
+        for block in numba.prange((size + KERNEL_BLOCK - 1) // KERNEL_BLOCK):
+            first = block * KERNEL_BLOCK
+            last = min(first + KERNEL_BLOCK, size)
+            # Position of the first point, and its offset in every input (strides are 0 along broadcast axes)
+            coords = np.empty(ndim, dtype=np.int64)
+            offsets = np.zeros(n_inputs, dtype=np.int64)
+            for axis in range(ndim):
+                coords[axis] = (first // pitches[axis]) % shape[axis]
+                for row in range(n_inputs):
+                    offsets[row] += coords[axis] * strides[row, axis]
+
+            for k in range(first, last):
+                prev = prevalence[offsets[4]]
+                t_full = full_time[offsets[5]]
+                t_abbr = abbr_time[offsets[6]]
+
+                # Confusion matrices as in calculate_confusion_matrix with population_size 1
+                abbr_tp = sens_abbr[offsets[0]] * prev
+                abbr_fp = (1 - spec_abbr[offsets[1]]) * (1 - prev)
+                ai_tp = sens_ai[offsets[2]] * prev
+                ai_fn = (1 - sens_ai[offsets[2]]) * prev
+                ai_fp = (1 - spec_ai[offsets[3]]) * (1 - prev)
+                ai_tn = spec_ai[offsets[3]] * (1 - prev)
+
+                # Best case (max overlap) and worst case (min overlap) recall rates
+                recall_best = (abbr_tp - min(ai_tp, abbr_tp)) + (abbr_fp - min(ai_fp, abbr_fp))
+                recall_worst = (abbr_tp - max(0.0, (ai_tp + abbr_tp) - prev)) + (
+                    abbr_fp - max(0.0, (ai_fp + abbr_fp) - (1 - prev))
+                )
+
+                out[0, k] = recall_best
+                out[1, k] = recall_worst
+                out[2, k] = t_abbr * (ai_tn + ai_fn) + t_full * (ai_tp + ai_fp + recall_best)
+                out[3, k] = t_abbr * (ai_tn + ai_fn) + t_full * (ai_tp + ai_fp + recall_worst)
+
+                # Step to the next point, carrying over to slower axes at the end of an axis
+                axis = ndim - 1
+                coords[axis] += 1
+                for row in range(n_inputs):
+                    offsets[row] += strides[row, axis]
+                while axis > 0 and coords[axis] == shape[axis]:
+                    for row in range(n_inputs):
+                        offsets[row] += strides[row, axis - 1] - shape[axis] * strides[row, axis]
+                    coords[axis] = 0
+                    axis -= 1
+                    coords[axis] += 1
+
+
+def numba_parameter_set(**kwargs):
+    """
+    Calculate the outputs of process_parameter_set in one fused, parallel loop compiled with Numba.
+
+    Every intermediate value (confusion matrices, overlaps) stays in registers, so only the
+    inputs are read and the outputs written, without temporary arrays. Inputs are read through
+    their strides in the broadcast shape, so broadcast inputs such as the axes of a grid are never
+    expanded. The loop runs over blocks of consecutive points, so sweeps and grids of any dimension
+    use all threads. Outputs that do not depend on the AI model are calculated with NumPy on the
+    broadcast shape of their own inputs, and only expanded as read-only views.
+
+    Parameters
+    ----------
+    **kwargs : dict
+        The parameters of process_parameter_set, as scalars or arrays that broadcast together
+
+    Returns
+    -------
+    dict
+        The outputs of process_parameter_set, all with the broadcast shape of the inputs
+    """
+    # Contiguous inputs, so that their strides index their flattened values
+    inputs = [np.asarray(kwargs[name], dtype=np.float64) for name in KERNEL_INPUTS]
+    inputs = [np.ascontiguousarray(values).reshape(values.shape) for values in inputs]
+    shape = np.broadcast_shapes(*(values.shape for values in inputs))
+    kernel_shape = np.array(shape or (1,), dtype=np.int64)
+    strides = np.zeros((len(inputs), kernel_shape.size), dtype=np.int64)
+    for row, values in enumerate(inputs):
+        if values.ndim:
+            strides[row, kernel_shape.size - values.ndim :] = np.broadcast_to(values, shape).strides[-values.ndim :]
+    strides //= np.dtype(np.float64).itemsize
+    out = np.empty((len(KERNEL_OUTPUTS), int(np.prod(shape))))
+    _fused_kernel(*(values.ravel() for values in inputs), strides, kernel_shape, out)
+    new_data = {key: out[row].reshape(shape)[()] for row, key in enumerate(KERNEL_OUTPUTS)}
+
+    # Outputs of the abbreviated and full protocols
+    params = dict(zip(KERNEL_INPUTS, inputs))
+    abbr_matrix = calculate_confusion_matrix(
+        params["sensitivity_abbr"], params["specificity_abbr"], params["prevalence"]
+    )
+    recall_abbr = abbr_matrix["tp"] + abbr_matrix["fp"]
+    constant = {
+        "recall_abbr": recall_abbr,
+        "recall_full": 0.0,
+        "avg_time_abbr": params["abbr_time"] + recall_abbr * params["full_time"],
+        "avg_time_full": params["full_time"],
+    }
+    new_data.update({key: np.broadcast_to(value, shape)[()] for key, value in constant.items()})
+    return new_data
+
+
+BACKENDS = {"numpy": process_parameter_set}
+if numba is not None:
+    BACKENDS["numba"] = numba_parameter_set
+
+
+def set_default_backend(name):
+    """
+    Set the backend used when no backend is passed explicitly.
+
+    Parameters
+    ----------
+    name : {'auto', 'numpy', 'numba'}
+        Name of the backend. 'auto' selects Numba when it is installed, and NumPy otherwise.
+    """
+    global _default_backend
+    _default_backend = name
+
+
+def resolve_backend(name=None):
+    """
+    Return the name of the backend that will be used.
+
+    Parameters
+    ----------
+    name : {'auto', 'numpy', 'numba'}, optional
+        Requested backend, by default the default backend: the ADAPTIVE_MRI_BOUNDS_BACKEND
+        environment variable, 'numpy' if it is not set, or the backend set with set_default_backend
+
+    Returns
+    -------
+    str
+        'numba' or 'numpy'. A request for Numba falls back to NumPy, with a warning, when
+        Numba is not installed.
+    """
+    name = name or _default_backend
+    if name == "auto":
+        return "numba" if "numba" in BACKENDS else "numpy"
+    if name == "numba" and "numba" not in BACKENDS:
+        warnings.warn("Numba is not installed, falling back to the NumPy backend")
+        return "numpy"
+    if name not in ("numpy", "numba"):
+        raise ValueError(f"Unknown backend '{name}', expected 'auto', 'numpy' or 'numba'")
+    return name
+
+
+def get_backend(name=None):
+    """
+    Return the function calculating recall rates and average protocol times for a backend.
+
+    Parameters
+    ----------
+    name : {'auto', 'numpy', 'numba'}, optional
+        Requested backend, by default the default backend
+
+    Returns
+    -------
+    callable
+        Function with the same parameters and outputs as process_parameter_set
+    """
+    return BACKENDS[resolve_backend(name)]
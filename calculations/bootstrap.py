@@ -0,0 +1,181 @@
+"""Bootstrap the bounds and the empirical adaptive protocol from per-case reader-study data."""
+
+import numpy as np
+from calculations.backends import get_backend
+
+
+# Number of bootstrap replicates resampled at once
+BATCH_SIZE = 64
+
+
+def _cell_index(cases):
+    """Encode every case as one of 8 cells: cancer, AI positive and abbreviated positive as bits."""
+    return (
+        cases["cancer"].astype(np.intp) * 4
+        + cases["ai_positive"].astype(np.intp) * 2
+        + cases["abbr_positive"].astype(np.intp)
+    )
+
+
+def _resampled_cell_counts(cells, n_replicates, rng, batch_size):
+    """Resample the cases with replacement and count the cases per cell in every replicate."""
+    n_cases = cells.size
+    counts = np.empty((n_replicates, 8), dtype=np.int64)
+    for first in range(0, n_replicates, batch_size):
+        last = min(first + batch_size, n_replicates)
+        indices = rng.integers(0, n_cases, size=(last - first, n_cases))
+        # Offset the cells of every replicate, so one bincount counts all replicates of the batch
+        offsets = 8 * np.arange(last - first)[:, np.newaxis]
+        batch_counts = np.bincount((cells[indices] + offsets).ravel(), minlength=8 * (last - first))
+        counts[first:last] = batch_counts.reshape(-1, 8)
+    return counts
+
+
+def statistics_from_counts(counts, performance_params, backend=None):
+    """
+    Calculate performance parameters, bounds and the empirical adaptive protocol from cell counts.
+
+    Parameters
+    ----------
+    counts : numpy.ndarray
+        Number of cases per cell, of shape (..., 8), with the cell index
+        4 * cancer + 2 * ai_positive + abbr_positive
+    performance_params : dict
+        Dictionary containing the protocol durations 'full_time' and 'abbr_time'
+    backend : {'auto', 'numpy', 'numba'}, optional
+        Implementation of the bound calculation, by default the default backend
+
+    Returns
+    -------
+    dict
+        Dictionary with arrays of shape counts.shape[:-1] containing:
+        the estimated 'sensitivity_abbr', 'specificity_abbr', 'sensitivity_ai', 'specificity_ai'
+        and 'prevalence'; the outputs of process_parameter_set for these estimates;
+        'recall_ai_empirical' and 'avg_time_ai_empirical', the recall rate and average time of
+        the adaptive protocol given the observed overlap between AI and radiologists; and
+        'band_position', where the empirical recall rate lies between the worst case (0) and
+        the best case (1), NaN where both bounds coincide. Because the time bounds are linear
+        in the recall rate, the empirical average time lies at the same position between its bounds.
+    """
+    counts = np.asarray(counts, dtype=np.float64)
+    cell = counts.reshape(counts.shape[:-1] + (2, 2, 2))  # cancer, ai_positive, abbr_positive
+    n_cases = counts.sum(axis=-1)
+    n_cancer = cell[..., 1, :, :].sum(axis=(-2, -1))
+    n_healthy = n_cases - n_cancer
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        params = dict(performance_params)
+        params["prevalence"] = n_cancer / n_cases
+        params["sensitivity_abbr"] = cell[..., 1, :, 1].sum(axis=-1) / n_cancer
+        params["specificity_abbr"] = cell[..., 0, :, 0].sum(axis=-1) / n_healthy
+        params["sensitivity_ai"] = cell[..., 1, 1, :].sum(axis=-1) / n_cancer
+        params["specificity_ai"] = cell[..., 0, 0, :].sum(axis=-1) / n_healthy
+        bounds = get_backend(backend)(**params)
+
+        # Adaptive protocol: AI positives get the full protocol, AI negatives the abbreviated
+        # protocol, and AI negatives recalled by the radiologist get the full protocol afterwards
+        ai_negative = cell[..., :, 0, :].sum(axis=(-2, -1)) / n_cases
+        recall_empirical = cell[..., :, 0, 1].sum(axis=-1) / n_cases
+        avg_time_empirical = params["abbr_time"] * ai_negative + params["full_time"] * (
+            1 - ai_negative + recall_empirical
+        )
+        band_position = (bounds["recall_ai_worst_case"] - recall_empirical) / (
+            bounds["recall_ai_worst_case"] - bounds["recall_ai_best_case"]
+        )
+        # The position is undefined where the bounds coincide
+        band_position = np.where(np.isfinite(band_position), band_position, np.nan)
+
+    statistics = {key: params[key] for key in ("prevalence", "sensitivity_abbr", "specificity_abbr")}
+    statistics.update({key: params[key] for key in ("sensitivity_ai", "specificity_ai")})
+    statistics.update({key: np.broadcast_to(value, n_cases.shape) for key, value in bounds.items()})
+    statistics["recall_ai_empirical"] = recall_empirical
+    statistics["avg_time_ai_empirical"] = avg_time_empirical
+    statistics["band_position"] = band_position
+    return statistics
+
+
+def bootstrap_reader_study(
+    cases, performance_params, n_replicates=2000, seed=None, batch_size=BATCH_SIZE, backend=None
+):
+    """
+    Bootstrap the recall rates and average protocol times from per-case reader-study data.
+
+    Cases are resampled with replacement by drawing index arrays for a batch of replicates at
+    once. Every case is reduced beforehand to one of 8 cells (cancer, AI positive, abbreviated
+    positive), so a replicate is summarized by counting the resampled cells, and all statistics
+    are calculated for all replicates together.
+
+    Parameters
+    ----------
+    cases : dict
+        Dictionary with boolean arrays 'cancer', 'ai_positive' and 'abbr_positive',
+        as returned by utils.reader_study.load_reader_study
+    performance_params : dict
+        Dictionary containing the protocol durations 'full_time' and 'abbr_time'
+    n_replicates : int, optional
+        Number of bootstrap replicates, by default 2000
+    seed : int, optional
+        Seed of the random number generator, by default None
+    batch_size : int, optional
+        Number of replicates resampled at once, by default BATCH_SIZE
+    backend : {'auto', 'numpy', 'numba'}, optional
+        Implementation of the bound calculation, by default the default backend
+
+    Returns
+    -------
+    dict
+        Dictionary with one array of n_replicates values per statistic of statistics_from_counts
+    """
+    cells = _cell_index(cases)
+    rng = np.random.default_rng(seed)
+    counts = _resampled_cell_counts(cells, n_replicates, rng, batch_size)
+    return statistics_from_counts(counts, performance_params, backend=backend)
+
+
+def confidence_interval(replicates, level=0.95):
+    """
+    Calculate percentile bootstrap confidence intervals.
+
+    Parameters
+    ----------
+    replicates : dict
+        Bootstrap replicates, as returned by bootstrap_reader_study
+    level : float, optional
+        Confidence level, by default 0.95
+
+    Returns
+    -------
+    dict
+        Dictionary with the (lower, upper) bounds of every statistic. Replicates in which a
+        statistic is undefined or infinite (e.g. no cancers were drawn) are ignored.
+    """
+    tails = 100 * np.array([(1 - level) / 2, (1 + level) / 2])
+    intervals = {}
+    for key, values in replicates.items():
+        values = np.asarray(values, dtype=np.float64)
+        # nanpercentile ignores NaN but not infinity
+        intervals[key] = tuple(np.nanpercentile(np.where(np.isfinite(values), values, np.nan), tails))
+    return intervals
+
+
+def band_interval(replicates, level=0.95):
+    """
+    Calculate the position of the empirical band between the worst and best case bounds.
+
+    The figure functions shade the band from worst - lower * (worst - best) to
+    worst - upper * (worst - best); this function estimates (lower, upper) from the data.
+
+    Parameters
+    ----------
+    replicates : dict
+        Bootstrap replicates, as returned by bootstrap_reader_study
+    level : float, optional
+        Confidence level, by default 0.95
+
+    Returns
+    -------
+    tuple
+        (lower, upper) confidence bounds of the band position, between 0 and 1
+    """
+    lower, upper = confidence_interval({"band_position": replicates["band_position"]}, level)["band_position"]
+    return float(np.clip(lower, 0, 1)), float(np.clip(upper, 0, 1))
@@ -0,0 +1,229 @@
+"""Compare two versions of a sweep chunk by chunk, e.g. before and after a change of parameters or formulas."""
+
+import numpy as np
+from pathlib import Path
+from calculations.adaptive import adaptive_sample
+from calculations.sweep import CHUNK_SIZE, iter_param_range
+from utils.result_store import METADATA_NAME, iter_result_store, open_result_store
+
+
+def _extend(buffer, chunk):
+    if buffer is None:
+        return {key: np.asarray(values, dtype=np.float64) for key, values in chunk.items()}
+    return {key: np.concatenate((values, np.asarray(chunk[key], dtype=np.float64))) for key, values in buffer.items()}
+
+
+def iter_diff(stream_a, stream_b, changing_param):
+    """
+    Align two sweeps on their parameter axis and yield the differences b - a, chunk by chunk.
+
+    Where both sweeps have the same parameter values, the outputs are subtracted directly.
+    Otherwise sweep b is linearly interpolated at the parameter values of sweep a. Sweep b is
+    only read as far as needed for the current chunk of sweep a, so neither sweep is held in
+    memory as a whole.
+
+    Parameters
+    ----------
+    stream_a : iterator of dict
+        Chunks of the reference sweep, e.g. from calculations.sweep.iter_sweep or
+        utils.result_store.iter_result_store
+    stream_b : iterator of dict
+        Chunks of the sweep compared against the reference
+    changing_param : str
+        Name of the parameter varied in both sweeps, in increasing order
+
+    Yields
+    ------
+    dict
+        Differences b - a of every output stored in both sweeps, and the parameter values of
+        sweep a under changing_param. Values of sweep a outside the range of sweep b are skipped.
+    """
+    stream_b = iter(stream_b)
+    buffer = None
+    exhausted = False
+    for chunk in stream_a:
+        x = np.asarray(chunk[changing_param], dtype=np.float64)
+        if not x.size:
+            continue
+
+        # Read sweep b until it covers the current chunk of sweep a
+        while not exhausted and (buffer is None or buffer[changing_param][-1] < x[-1]):
+            try:
+                buffer = _extend(buffer, next(stream_b))
+            except StopIteration:
+                exhausted = True
+        if buffer is None or not buffer[changing_param].size:
+            return
+        keys = [key for key in chunk if key in buffer and key != changing_param]
+
+        x_b = buffer[changing_param]
+        inside = (x >= x_b[0]) & (x <= x_b[-1])
+        x_inside = x[inside]
+        first = int(np.searchsorted(x_b, x_inside[0])) if x_inside.size else 0
+        same_axis = np.array_equal(x_b[first : first + x_inside.size], x_inside)
+        diff = {changing_param: x_inside}
+        for key in keys:
+            values = np.asarray(chunk[key], dtype=np.float64)[inside]
+            if same_axis:
+                diff[key] = buffer[key][first : first + values.size] - values
+            else:
+                diff[key] = np.interp(x_inside, x_b, buffer[key]) - values
+        yield diff
+
+        # Keep the last value of sweep b at or below the chunk end, to interpolate the next chunk
+        keep = max(int(np.searchsorted(x_b, x[-1], side="right")) - 1, 0)
+        buffer = {key: values[keep:] for key, values in buffer.items()}
+
+
+def diff_summary(stream, changing_param):
+    """
+    Summarize the differences between two sweeps.
+
+    Parameters
+    ----------
+    stream : iterator of dict
+        Difference chunks, as yielded by iter_diff
+    changing_param : str
+        Name of the parameter varied in both sweeps
+
+    Returns
+    -------
+    dict
+        Dictionary with a dict per output containing:
+        'max' : largest absolute difference
+        'mean' : mean absolute difference
+        'location' : parameter value of the largest absolute difference
+        'diff' : signed difference b - a at that location
+        'count' : number of compared sweep steps
+    """
+    summary = {}
+    for chunk in stream:
+        x = chunk[changing_param]
+        if not x.size:
+            continue
+        for key, values in chunk.items():
+            if key == changing_param:
+                continue
+            stats = summary.setdefault(key, {"max": 0.0, "location": np.nan, "diff": 0.0, "count": 0, "sum": 0.0})
+            magnitude = np.abs(values)
+            index = int(np.argmax(magnitude))
+            if not stats["count"] or magnitude[index] > stats["max"]:
+                stats.update(max=float(magnitude[index]), location=float(x[index]), diff=float(values[index]))
+            stats["sum"] += float(magnitude.sum())
+            stats["count"] += values.size
+    for stats in summary.values():
+        stats["mean"] = stats.pop("sum") / stats["count"]
+    return summary
+
+
+def _param_range_stream(changing_param, param_range, performance_params, chunk_size=CHUNK_SIZE, **kwargs):
+    """Stream a sweep sampled as its 'sampling' mode asks, an adaptive sweep as a single chunk."""
+    if param_range.get("sampling", "linspace") == "adaptive":
+        yield adaptive_sample(
+            changing_param,
+            param_range["start"],
+            param_range["end"],
+            performance_params,
+            tolerance=param_range.get("tolerance", 1e-3),
+            max_points=param_range["step"],
+            **kwargs,
+        )
+    else:
+        yield from iter_param_range(changing_param, param_range, performance_params, chunk_size=chunk_size, **kwargs)
+
+
+def config_diff(
+    changing_param, performance_params_a, performance_params_b, param_range_a, param_range_b=None, **kwargs
+):
+    """
+    Stream the differences of a sweep between two versions of the configuration.
+
+    Parameters
+    ----------
+    changing_param : str
+        Name of the parameter varied in the sweep
+    performance_params_a : dict
+        Reference performance parameters
+    performance_params_b : dict
+        Performance parameters compared against the reference
+    param_range_a : dict
+        Reference 'parameter_range', with 'start', 'end', and 'step' values, and optionally
+        'sampling' and 'tolerance' as in changing_parameters.toml
+    param_range_b : dict, optional
+        Compared 'parameter_range', by default param_range_a
+    **kwargs : dict
+        Passed on to calculations.sweep.iter_param_range ('chunk_size', 'backend', ...), or to
+        calculations.adaptive.adaptive_sample for adaptive sampling, except 'chunk_size'
+
+    Yields
+    ------
+    dict
+        Difference chunks, as yielded by iter_diff
+    """
+    stream_a = _param_range_stream(changing_param, param_range_a, performance_params_a, **kwargs)
+    stream_b = _param_range_stream(changing_param, param_range_b or param_range_a, performance_params_b, **kwargs)
+    yield from iter_diff(stream_a, stream_b, changing_param)
+
+
+def store_diff(store_a, store_b, chunk_size=CHUNK_SIZE):
+    """
+    Stream the differences between two result stores.
+
+    Parameters
+    ----------
+    store_a : Path or str
+        Directory of the reference result store
+    store_b : Path or str
+        Directory of the compared result store
+    chunk_size : int, optional
+        Maximum number of sweep steps read at once, by default CHUNK_SIZE
+
+    Yields
+    ------
+    dict
+        Difference chunks, as yielded by iter_diff
+
+    Raises
+    ------
+    ValueError
+        If the stores vary different parameters
+    """
+    _, info_a = open_result_store(store_a)
+    _, info_b = open_result_store(store_b)
+    if info_a["changing_param"] != info_b["changing_param"]:
+        raise ValueError(
+            f"Result stores vary different parameters: '{info_a['changing_param']}' and '{info_b['changing_param']}'"
+        )
+    stream_a = iter_result_store(store_a, chunk_size)
+    stream_b = iter_result_store(store_b, chunk_size)
+    yield from iter_diff(stream_a, stream_b, info_a["changing_param"])
+
+
+def compare_result_sets(dir_a, dir_b, chunk_size=CHUNK_SIZE):
+    """
+    Compare every result store found in both of two directories.
+
+    Parameters
+    ----------
+    dir_a : Path or str
+        Directory with the reference result stores, one sub-directory per sweep
+    dir_b : Path or str
+        Directory with the compared result stores, matched to dir_a by sub-directory name
+    chunk_size : int, optional
+        Maximum number of sweep steps read at once, by default CHUNK_SIZE
+
+    Returns
+    -------
+    dict
+        Dictionary with the diff_summary of every store present in both directories,
+        keyed by sub-directory name
+    """
+    summaries = {}
+    for metadata_path in sorted(Path(dir_a).glob(f"*/{METADATA_NAME}")):
+        name = metadata_path.parent.name
+        store_b = Path(dir_b) / name
+        if not (store_b / METADATA_NAME).exists():
+            continue
+        _, info = open_result_store(metadata_path.parent)
+        summaries[name] = diff_summary(store_diff(metadata_path.parent, store_b, chunk_size), info["changing_param"])
+    return summaries
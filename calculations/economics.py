@@ -0,0 +1,216 @@
+"""Costs and scanner capacity of the protocols, derived from recall rates and average protocol times."""
+
+import numpy as np
+from calculations.calculations import calculate_confusion_matrix
+
+
+# Protocols, as suffixes of the recall and time outputs of process_parameter_set
+PROTOCOLS = ("ai_best_case", "ai_worst_case", "abbr", "full")
+
+# Site parameters, with costs in one currency and reading times in seconds
+SITE_KEYS = (
+    "scanner_cost_per_hour",
+    "radiologist_cost_per_hour",
+    "reading_time_full",
+    "reading_time_abbr",
+    "recall_cost",
+    "annual_volume",
+)
+
+
+def load_sites(economics_params):
+    """
+    Combine the default site parameters with the overrides of every site.
+
+    Parameters
+    ----------
+    economics_params : dict
+        Parameters as loaded from economics_parameters.toml, with a 'defaults' table
+        and optionally a 'sites' table holding one table of overrides per site
+
+    Returns
+    -------
+    tuple
+        (names, sites): the list of site names, and a dictionary with one array of
+        len(names) values per key in SITE_KEYS. Without a 'sites' table, the defaults
+        are returned as a single site named 'default'.
+
+    Raises
+    ------
+    ValueError
+        If a site parameter is missing or unknown
+    """
+    defaults = economics_params["defaults"]
+    overrides = economics_params.get("sites") or {"default": {}}
+    names = list(overrides)
+    sites = {key: np.empty(len(names)) for key in SITE_KEYS}
+    for index, name in enumerate(names):
+        site = {**defaults, **overrides[name]}
+        unknown = set(site) - set(SITE_KEYS)
+        if unknown:
+            raise ValueError(f"Unknown parameters {sorted(unknown)} for site '{name}'")
+        for key in SITE_KEYS:
+            if key not in site:
+                raise ValueError(f"Site '{name}' has no parameter '{key}'")
+            sites[key][index] = site[key]
+    return names, sites
+
+
+def _scan_fractions(data, params):
+    """Return the fraction of patients getting an abbreviated and a full scan under every protocol."""
+    ai_matrix = calculate_confusion_matrix(params["sensitivity_ai"], params["specificity_ai"], params["prevalence"])
+    ai_negative = ai_matrix["tn"] + ai_matrix["fn"]
+    fractions = {
+        "ai_best_case": (ai_negative, 1 - ai_negative + data["recall_ai_best_case"]),
+        "ai_worst_case": (ai_negative, 1 - ai_negative + data["recall_ai_worst_case"]),
+        "abbr": (1.0, data["recall_abbr"]),
+        "full": (0.0, 1.0),
+    }
+    return fractions
+
+
+def economics(data, performance_params, site, changing_param=None):
+    """
+    Calculate the cost per screen and the scanner capacity of every protocol.
+
+    The calculation only combines existing outputs of process_parameter_set with the site
+    parameters, so any sweep or grid result can be priced without evaluating the bounds again.
+    Site parameters given as arrays of shape (n_sites,) are placed on a new leading axis, so all
+    sites are priced at once and every output has shape (n_sites,) + result shape.
+
+    Parameters
+    ----------
+    data : dict
+        Results with every key in calculations.results.OUTPUT_KEYS, e.g. from
+        calculations.grid.evaluate_grid, or from compute_results after expand_results
+    performance_params : dict
+        Dictionary containing the performance parameters the results were calculated with.
+        Varied parameters must be given as arrays that broadcast against the results.
+    site : dict
+        Dictionary with a value or an array of values per key in SITE_KEYS, e.g. from load_sites
+    changing_param : str, optional
+        Name of the parameter varied in a sweep. Its values are taken from data, so the fixed
+        performance parameters can be passed as they are.
+
+    Returns
+    -------
+    dict
+        Dictionary containing, for every protocol in PROTOCOLS:
+        'cost_per_screen_<protocol>' : scanner time, reading time and recall workup per screen
+        'annual_cost_<protocol>' : cost per screen times the annual volume
+        'scanner_hours_saved_<protocol>' : scanner hours per year saved compared to the full protocol
+    """
+    params = dict(performance_params)
+    if changing_param is not None:
+        params[changing_param] = data[changing_param]
+    ndim = max(np.ndim(data[f"avg_time_{protocol}"]) for protocol in PROTOCOLS)
+    site = {key: np.reshape(site[key], np.shape(site[key]) + (1,) * ndim) for key in SITE_KEYS}
+
+    scanner_cost = site["scanner_cost_per_hour"] / 3600
+    reading_cost = site["radiologist_cost_per_hour"] / 3600
+    full_hours = params["full_time"] / 3600
+
+    costs = {}
+    for protocol, (abbr_fraction, full_fraction) in _scan_fractions(data, params).items():
+        avg_time = np.asarray(data[f"avg_time_{protocol}"], dtype=np.float64)
+        recall = np.asarray(data[f"recall_{protocol}"], dtype=np.float64)
+        reading_time = site["reading_time_abbr"] * abbr_fraction + site["reading_time_full"] * full_fraction
+        cost = scanner_cost * avg_time + reading_cost * reading_time + site["recall_cost"] * recall
+        costs[f"cost_per_screen_{protocol}"] = cost
+        costs[f"annual_cost_{protocol}"] = cost * site["annual_volume"]
+        costs[f"scanner_hours_saved_{protocol}"] = (full_hours - avg_time / 3600) * site["annual_volume"]
+    return costs
+
+
+def break_even(values, costs, key="cost_per_screen_ai_worst_case", reference="cost_per_screen_abbr"):
+    """
+    Find the parameter value at which a protocol costs as much as a reference protocol.
+
+    Parameters
+    ----------
+    values : array_like
+        Values of the changing parameter, in sweep order
+    costs : dict
+        Costs as returned by economics, with the sweep along the last axis
+    key : str, optional
+        Cost of the protocol, by default 'cost_per_screen_ai_worst_case'
+    reference : str, optional
+        Cost of the reference protocol, by default 'cost_per_screen_abbr'
+
+    Returns
+    -------
+    numpy.ndarray
+        Linearly interpolated value of the first crossing along the sweep, with the leading
+        (e.g. site) axes of the costs. NaN where the costs do not cross.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    diff = np.asarray(costs[key] - costs[reference])
+    changed = np.sign(diff[..., 1:]) != np.sign(diff[..., :1])
+    crossed = changed.any(axis=-1)
+    first = np.argmax(changed, axis=-1)[..., np.newaxis]
+    before = np.take_along_axis(diff, first, axis=-1)[..., 0]
+    after = np.take_along_axis(diff, first + 1, axis=-1)[..., 0]
+    x_before = values[first[..., 0]]
+    x_after = values[first[..., 0] + 1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        crossing = x_before + (x_after - x_before) * before / (before - after)
+    return np.where(crossed, crossing, np.nan)
+
+
+def interpolate_at(values, costs, value):
+    """
+    Linearly interpolate every output of a sweep at one parameter value.
+
+    Parameters
+    ----------
+    values : array_like
+        Values of the changing parameter, in increasing order
+    costs : dict
+        Costs as returned by economics, with the sweep along the last axis
+    value : float
+        Parameter value to interpolate at, clipped to the sweep range
+
+    Returns
+    -------
+    dict
+        Dictionary with the leading (e.g. site) axes of every output
+    """
+    values = np.asarray(values, dtype=np.float64)
+    value = np.clip(value, values[0], values[-1])
+    right = np.clip(np.searchsorted(values, value), 1, values.size - 1)
+    weight = (value - values[right - 1]) / (values[right] - values[right - 1])
+    return {key: output[..., right - 1] * (1 - weight) + output[..., right] * weight for key, output in costs.items()}
+
+
+def site_summary(names, sites, data, changing_param, performance_params):
+    """
+    Summarize the economics of every site for one sweep, e.g. for export with write_site_table.
+
+    Parameters
+    ----------
+    names : list of str
+        Site names, as returned by load_sites
+    sites : dict
+        Site parameters, as returned by load_sites
+    data : dict
+        Sweep results with every key in calculations.results.OUTPUT_KEYS
+    changing_param : str
+        Name of the parameter varied in the sweep
+    performance_params : dict
+        Dictionary containing the fixed performance parameters
+
+    Returns
+    -------
+    dict
+        Dictionary with one array of len(names) values per column: the site parameters,
+        every output of economics at the value of changing_param in performance_params,
+        and 'break_even_ai_best_case' and 'break_even_ai_worst_case', the values of
+        changing_param at which the adaptive protocol costs as much as the abbreviated protocol
+    """
+    values = data[changing_param]
+    costs = economics(data, performance_params, sites, changing_param=changing_param)
+    summary = {key: sites[key] for key in SITE_KEYS}
+    summary.update(interpolate_at(values, costs, performance_params[changing_param]))
+    for case in ("ai_best_case", "ai_worst_case"):
+        summary[f"break_even_{case}"] = break_even(values, costs, key=f"cost_per_screen_{case}")
+    return summary
@@ -0,0 +1,195 @@
+"""Evaluate the bounds on 2-D parameter grids."""
+
+import numpy as np
+from calculations.backends import get_backend, resolve_backend
+from calculations.parallel import map_shared
+
+
+# Maximum number of grid points evaluated at once by evaluate_surface
+CHUNK_SIZE = 2**20
+
+# Minimum number of tasks per worker of evaluate_surface, so that faster workers can take more of them
+TASKS_PER_WORKER = 8
+
+# Quantities of surface_outputs, in row order of the shared output of evaluate_surface
+SURFACE_KEYS = ("recall_gap", "time_savings_best_case", "time_savings_worst_case")
+
+_REDUCERS = {
+    "mean": np.add,
+    "min": np.minimum,
+    "max": np.maximum,
+}
+
+
+def evaluate_grid(x_param, x_values, y_param, y_values, performance_params, dtype="float64", backend=None):
+    """
+    Calculate recall rates and average protocol times on the grid spanned by two parameters.
+
+    Parameters
+    ----------
+    x_param : str
+        Name of the parameter varied along the columns of the grid
+    x_values : array_like
+        Values of x_param
+    y_param : str
+        Name of the parameter varied along the rows of the grid
+    y_values : array_like
+        Values of y_param
+    performance_params : dict
+        Dictionary containing the fixed performance parameters
+    dtype : str or numpy.dtype, optional
+        Data type of the returned arrays, by default 'float64'
+    backend : {'auto', 'numpy', 'numba'}, optional
+        Implementation of the bound calculation, by default the default backend
+        (see calculations.backends.resolve_backend)
+
+    Returns
+    -------
+    dict
+        Dictionary with the outputs of process_parameter_set as arrays of shape
+        (len(y_values), len(x_values))
+    """
+    x_values = np.asarray(x_values, dtype=np.float64)
+    y_values = np.asarray(y_values, dtype=np.float64)
+    shape = (y_values.size, x_values.size)
+    params = dict(performance_params)
+    params[x_param] = x_values[np.newaxis, :]
+    params[y_param] = y_values[:, np.newaxis]
+    new_data = get_backend(backend)(**params)
+    return {key: np.broadcast_to(value, shape).astype(dtype) for key, value in new_data.items()}
+
+
+def surface_outputs(data):
+    """
+    Derive the quantities shown on surface figures from the outputs of process_parameter_set.
+
+    Parameters
+    ----------
+    data : dict
+        Outputs of process_parameter_set, as scalars or arrays
+
+    Returns
+    -------
+    dict
+        Dictionary containing:
+        'recall_gap' : difference between worst and best case recall rate with AI
+        'time_savings_best_case' : abbreviated minus best case adaptive protocol time
+        'time_savings_worst_case' : abbreviated minus worst case adaptive protocol time
+        The adaptive protocol breaks even with the abbreviated protocol where the time savings are zero.
+    """
+    return {
+        "recall_gap": data["recall_ai_worst_case"] - data["recall_ai_best_case"],
+        "time_savings_best_case": data["avg_time_abbr"] - data["avg_time_ai_best_case"],
+        "time_savings_worst_case": data["avg_time_abbr"] - data["avg_time_ai_worst_case"],
+    }
+
+
+def _bin_starts(size, n_bins):
+    """Return the start index of each of n_bins contiguous, near-equal bins over size elements."""
+    n_bins = max(1, min(size, n_bins))
+    return np.linspace(0, size, n_bins + 1).astype(np.intp)[:-1]
+
+
+def _reduce_bins(values, starts, axis, reduce):
+    reduced = _REDUCERS[reduce].reduceat(values, starts, axis=axis)
+    if reduce == "mean":
+        counts = np.diff(np.append(starts, values.shape[axis]))
+        reduced /= np.expand_dims(counts, 1 - axis)
+    return reduced
+
+
+def _surface_rows(out, x_param, x_values, y_param, y_values, performance_params, bins, reduce, backend, first, last):
+    """Evaluate the output rows first to last of a surface and write them, aggregated, into out."""
+    x_starts, y_starts, y_ends = bins
+    rows = slice(y_starts[first], y_ends[last - 1])
+    grid = evaluate_grid(x_param, x_values, y_param, y_values[rows], performance_params, backend=backend)
+    outputs = surface_outputs(grid)
+    for index, key in enumerate(SURFACE_KEYS):
+        values = _reduce_bins(outputs[key], x_starts, axis=1, reduce=reduce)
+        out[index, first:last] = _reduce_bins(values, y_starts[first:last] - y_starts[first], axis=0, reduce=reduce)
+
+
+def evaluate_surface(
+    x_param,
+    x_values,
+    y_param,
+    y_values,
+    performance_params,
+    resolution=400,
+    reduce="mean",
+    dtype="float64",
+    backend=None,
+    workers=None,
+):
+    """
+    Calculate surface quantities on a 2-D grid, aggregated down to at most resolution cells per axis.
+
+    The grid is evaluated in blocks of rows, and every block is aggregated as soon as it is
+    calculated, so the full-resolution grid is never held in memory. With several workers, the
+    blocks are made smaller and handed out to one pool of processes by
+    calculations.parallel.map_shared, which write their aggregated rows into one shared output;
+    the results are bit-identical to the serial path.
+
+    Parameters
+    ----------
+    x_param : str
+        Name of the parameter varied along the columns of the grid
+    x_values : array_like
+        Values of x_param, in increasing order
+    y_param : str
+        Name of the parameter varied along the rows of the grid
+    y_values : array_like
+        Values of y_param, in increasing order
+    performance_params : dict
+        Dictionary containing the fixed performance parameters
+    resolution : int or tuple of int, optional
+        Maximum number of output cells per axis as a single value or as (rows, columns),
+        by default 400. Axes with fewer values are not aggregated.
+    reduce : {'mean', 'min', 'max'}, optional
+        How the grid points within one output cell are combined, by default 'mean'
+    dtype : str or numpy.dtype, optional
+        Data type of the returned arrays, by default 'float64'
+    backend : {'auto', 'numpy', 'numba'}, optional
+        Implementation of the bound calculation, by default the default backend
+        (see calculations.backends.resolve_backend)
+    workers : int, optional
+        Number of worker processes, by default None (evaluated in the calling process).
+        Scripts using workers need the usual ``if __name__ == "__main__":`` guard.
+
+    Returns
+    -------
+    dict
+        Dictionary with the quantities of surface_outputs as arrays of shape (rows, columns),
+        and the mean parameter value of every output row and column under the names
+        y_param and x_param
+    """
+    if reduce not in _REDUCERS:
+        raise ValueError(f"Unknown reduction '{reduce}', expected one of {sorted(_REDUCERS)}")
+    x_values = np.asarray(x_values, dtype=np.float64)
+    y_values = np.asarray(y_values, dtype=np.float64)
+    y_resolution, x_resolution = np.broadcast_to(resolution, (2,))
+    x_starts = _bin_starts(x_values.size, x_resolution)
+    y_starts = _bin_starts(y_values.size, y_resolution)
+    y_ends = np.append(y_starts[1:], y_values.size)
+
+    # Group output rows so that each block covers about CHUNK_SIZE grid points, and with
+    # workers into enough blocks to balance the load
+    workers = workers or 1
+    rows_per_bin = int(np.ceil(y_values.size / y_starts.size))
+    block_size = CHUNK_SIZE
+    if workers > 1:
+        block_size = min(block_size, x_values.size * y_values.size // (TASKS_PER_WORKER * workers))
+    bins_per_block = max(1, block_size // (rows_per_bin * x_values.size))
+    bounds = [
+        (first, min(first + bins_per_block, y_starts.size)) for first in range(0, y_starts.size, bins_per_block)
+    ]
+
+    # Resolve the backend here, so that workers do not depend on the default of their process
+    args = (x_param, x_values, y_param, y_values, performance_params, (x_starts, y_starts, y_ends), reduce)
+    args += (resolve_backend(backend),)
+    out = map_shared(_surface_rows, bounds, (len(SURFACE_KEYS), y_starts.size, x_starts.size), "float64", args, workers)
+
+    surface = {key: out[index].astype(dtype) for index, key in enumerate(SURFACE_KEYS)}
+    surface[x_param] = _reduce_bins(x_values[np.newaxis, :], x_starts, axis=1, reduce="mean")[0]
+    surface[y_param] = _reduce_bins(y_values[:, np.newaxis], y_starts, axis=0, reduce="mean")[:, 0]
+    return surface
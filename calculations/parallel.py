@@ -0,0 +1,164 @@
+"""Evaluate large parameter grids on several cores, sharing one output buffer between processes."""
+
+import os
+import sys
+import multiprocessing
+from multiprocessing import shared_memory
+import numpy as np
+from calculations.backends import get_backend, resolve_backend
+from calculations.results import OUTPUT_KEYS
+
+
+# Default number of grid points per task
+CHUNK_SIZE = 2**18
+
+# State of a worker process, set by _init_worker
+_worker = {}
+
+
+def _attach(name):
+    """Attach to an existing shared memory block without taking over its cleanup."""
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    # Before Python 3.13 attaching registers the block again with the resource tracker,
+    # which pool workers share with the parent, so the block is still removed only once
+    return shared_memory.SharedMemory(name=name)
+
+
+def _evaluate_chunk(out, axes, performance_params, backend, first, last):
+    """Evaluate the grid points with flat (C-order) indices first to last and write them into out."""
+    shape = tuple(values.size for values in axes.values())
+    indices = np.unravel_index(np.arange(first, last), shape)
+    params = dict(performance_params)
+    for (name, values), index in zip(axes.items(), indices):
+        params[name] = values[index]
+    new_data = get_backend(backend)(**params)
+    for row, key in enumerate(OUTPUT_KEYS):
+        out[row, first:last] = new_data[key]
+
+
+def _init_worker(shm_name, out_shape, dtype, function, args):
+    shm = _attach(shm_name)
+    _worker["shm"] = shm
+    _worker["out"] = np.ndarray(out_shape, dtype=dtype, buffer=shm.buf)
+    _worker["function"] = function
+    _worker["args"] = args
+
+
+def _run_task(bounds):
+    first, last = bounds
+    _worker["function"](_worker["out"], *_worker["args"], first, last)
+    return last - first
+
+
+def default_workers():
+    """Return the number of cores available to this process."""
+    return len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count()
+
+
+def map_shared(function, bounds, out_shape, dtype, args, workers=None):
+    """
+    Run function(out, *args, first, last) for every (first, last) in bounds on one pool of processes.
+
+    All tasks write into one shared output array of shape out_shape, so only the task bounds are
+    sent between processes. Tasks are handed out one at a time, so faster workers take more of them;
+    bounds should therefore hold many more tasks than there are workers. Workers are started as
+    fresh processes, so scripts calling this function need the usual ``if __name__ == "__main__":`` guard.
+
+    Parameters
+    ----------
+    function : callable
+        Module-level function writing the results of one task into out
+    bounds : list of tuple
+        (first, last) arguments of every task
+    out_shape : tuple of int
+        Shape of the output array
+    dtype : str or numpy.dtype
+        Data type of the output array
+    args : tuple
+        Further arguments of function, the same for every task
+    workers : int, optional
+        Number of worker processes, by default the number of available cores.
+        With 1 worker the tasks run in the calling process.
+
+    Returns
+    -------
+    numpy.ndarray
+        The output array, written by all tasks
+    """
+    dtype = np.dtype(dtype)
+    workers = max(1, min(workers or default_workers(), len(bounds)))
+    if workers == 1:
+        out = np.empty(out_shape, dtype=dtype)
+        for first, last in bounds:
+            function(out, *args, first, last)
+        return out
+
+    # Start workers from a fresh process rather than forking this one, which may be running
+    # threads of a compiled backend that do not survive a fork
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+    shm = shared_memory.SharedMemory(create=True, size=max(1, int(np.prod(out_shape)) * dtype.itemsize))
+    try:
+        with context.Pool(
+            workers, initializer=_init_worker, initargs=(shm.name, out_shape, dtype, function, args)
+        ) as pool:
+            for _ in pool.imap_unordered(_run_task, bounds):
+                pass
+        shared = np.ndarray(out_shape, dtype=dtype, buffer=shm.buf)
+        out = shared.copy()
+        # Release the view on the buffer before closing it
+        del shared
+    finally:
+        shm.close()
+        shm.unlink()
+    return out
+
+
+def evaluate_grid_parallel(
+    axes, performance_params, workers=None, chunk_size=CHUNK_SIZE, dtype="float64", backend=None
+):
+    """
+    Calculate recall rates and average protocol times on a grid, split over a pool of processes.
+
+    The grid is split into chunks of chunk_size points that are handed out to the workers one at a
+    time by map_shared, so faster workers take more chunks. Every worker writes its results directly
+    into one shared memory buffer; only the chunk bounds are sent between processes. Every grid point
+    is calculated with the same operations as in the serial path, so the results are bit-identical
+    to calculations.grid.evaluate_grid. Workers are started as fresh processes, so scripts calling
+    this function need the usual ``if __name__ == "__main__":`` guard.
+
+    Parameters
+    ----------
+    axes : dict
+        Dictionary mapping each varied parameter name to its values. The grid spans all
+        combinations, with the first parameter varying slowest.
+    performance_params : dict
+        Dictionary containing the fixed performance parameters
+    workers : int, optional
+        Number of worker processes, by default the number of available cores.
+        With 1 worker the grid is evaluated in the calling process.
+    chunk_size : int, optional
+        Number of grid points per task, by default CHUNK_SIZE
+    dtype : str or numpy.dtype, optional
+        Data type of the returned arrays, by default 'float64'
+    backend : {'auto', 'numpy', 'numba'}, optional
+        Implementation of the bound calculation, by default the default backend
+        (see calculations.backends.resolve_backend). Workers use the same backend.
+
+    Returns
+    -------
+    dict
+        Dictionary with the outputs of process_parameter_set as arrays of shape
+        (len(values) for values in axes.values())
+    """
+    axes = {name: np.asarray(values, dtype=np.float64) for name, values in axes.items()}
+    shape = tuple(values.size for values in axes.values())
+    size = int(np.prod(shape))
+    bounds = [(first, min(first + chunk_size, size)) for first in range(0, size, chunk_size)]
+    # Resolve the backend here, so that workers do not depend on the default of their process
+    backend = resolve_backend(backend)
+    out = map_shared(
+        _evaluate_chunk, bounds, (len(OUTPUT_KEYS), size), dtype, (axes, performance_params, backend), workers
+    )
+    return {key: out[row].reshape(shape) for row, key in enumerate(OUTPUT_KEYS)}
@@ -1,3 +1,4 @@
+import numpy as np
 from calculations.calculations import calculate_confusion_matrix
 
 
@@ -5,6 +6,9 @@ def process_parameter_set(**kwargs):
     """
     Process a set of parameters to calculate recall rates and average protocol times.
 
+    Every parameter may be a scalar or a NumPy array. Arrays are combined elementwise
+    following the NumPy broadcasting rules, so a whole sweep can be evaluated in one call.
+
     Parameters
     ----------
     **kwargs : dict
@@ -63,16 +67,16 @@ def process_parameter_set(**kwargs):
     ai_matrix = calculate_confusion_matrix(sensitivity_ai, specificity_ai, prevalence)
 
     # Calculate max overlap (best case scenario)
-    max_overlap_tp = min(ai_matrix["tp"], abbr_matrix["tp"])  # Maximum possible overlap
-    max_overlap_fp = min(ai_matrix["fp"], abbr_matrix["fp"])
+    max_overlap_tp = np.minimum(ai_matrix["tp"], abbr_matrix["tp"])  # Maximum possible overlap
+    max_overlap_fp = np.minimum(ai_matrix["fp"], abbr_matrix["fp"])
     need_full_tp_best_case = abbr_matrix["tp"] - max_overlap_tp
     need_full_fp_best_case = abbr_matrix["fp"] - max_overlap_fp
 
     # Calculate min overlap (worst case scenario)
-    min_overlap_tp = max(
+    min_overlap_tp = np.maximum(
         0.0, (ai_matrix["tp"] + abbr_matrix["tp"]) - prevalence
     )  # Minimum possible overlap given total positives
-    min_overlap_fp = max(
+    min_overlap_fp = np.maximum(
         0.0, (ai_matrix["fp"] + abbr_matrix["fp"]) - (1 - prevalence)
     )  # Minimum possible overlap given total negatives
     need_full_tp_worst_case = abbr_matrix["tp"] - min_overlap_tp
@@ -0,0 +1,123 @@
+"""Compact, struct-of-arrays storage of sweep results."""
+
+import numpy as np
+from calculations.backends import get_backend
+
+
+# All outputs of process_parameter_set, in plotting order
+OUTPUT_KEYS = (
+    "recall_ai_best_case",
+    "recall_ai_worst_case",
+    "recall_abbr",
+    "recall_full",
+    "avg_time_ai_best_case",
+    "avg_time_ai_worst_case",
+    "avg_time_abbr",
+    "avg_time_full",
+)
+
+# Outputs that are constant or follow directly from the parameter set, dropped in compact mode
+DERIVED_KEYS = ("recall_full", "avg_time_full")
+
+
+def compute_results(changing_param, values, performance_params, dtype="float64", compact=False, backend=None):
+    """
+    Calculate the bounds for recall rate and average protocol time over a sweep of one parameter.
+
+    Parameters
+    ----------
+    changing_param : str
+        Name of the parameter being varied in the analysis
+    values : array_like
+        Values of the changing parameter, in sweep order
+    performance_params : dict
+        Dictionary containing the fixed performance parameters
+    dtype : str or numpy.dtype, optional
+        Data type of the stored outputs, by default 'float64'. The bounds are always
+        calculated in float64 and only rounded when stored, so 'float32' or 'float16'
+        trade precision for memory without changing the calculation itself.
+    compact : bool, optional
+        If True, the outputs in DERIVED_KEYS are not stored, by default False.
+        Use expand_results to restore them.
+    backend : {'auto', 'numpy', 'numba'}, optional
+        Implementation of the bound calculation, by default the default backend
+        (see calculations.backends.resolve_backend)
+
+    Returns
+    -------
+    dict
+        Dictionary with one 1-D array per output, and the changing parameter values
+        (always float64) under the changing parameter name
+    """
+    values = np.asarray(values, dtype=np.float64)
+    params = dict(performance_params)
+    params[changing_param] = values
+    new_data = get_backend(backend)(**params)
+
+    data = {}
+    for key in OUTPUT_KEYS:
+        if compact and key in DERIVED_KEYS:
+            continue
+        data[key] = np.broadcast_to(new_data[key], values.shape).astype(dtype)
+    data[changing_param] = values
+    return data
+
+
+def expand_results(data, changing_param, performance_params):
+    """
+    Restore the outputs dropped by compute_results in compact mode.
+
+    Parameters
+    ----------
+    data : dict
+        Results as returned by compute_results
+    changing_param : str
+        Name of the parameter being varied in the analysis
+    performance_params : dict
+        Dictionary containing the fixed performance parameters
+
+    Returns
+    -------
+    dict
+        Copy of data that contains every key in OUTPUT_KEYS. Restored outputs are
+        read-only broadcast views, so they take no memory per sweep point.
+    """
+    data = dict(data)
+    values = data[changing_param]
+    dtype = data["recall_abbr"].dtype
+    full_time = values if changing_param == "full_time" else performance_params["full_time"]
+    derived = {
+        "recall_full": np.zeros((), dtype=dtype),
+        "avg_time_full": np.asarray(full_time, dtype=dtype),
+    }
+    for key, value in derived.items():
+        if key not in data:
+            data[key] = np.broadcast_to(value, values.shape)
+    return data
+
+
+def max_relative_error(data, reference):
+    """
+    Calculate the largest relative deviation of each output from a reference result.
+
+    Parameters
+    ----------
+    data : dict
+        Results to check, typically calculated with a reduced dtype
+    reference : dict
+        Results calculated with dtype float64
+
+    Returns
+    -------
+    dict
+        Maximum of |data - reference| / max(|reference|) per output present in both
+    """
+    errors = {}
+    for key in OUTPUT_KEYS:
+        if key not in data or key not in reference:
+            continue
+        ref = np.asarray(reference[key], dtype=np.float64)
+        scale = np.max(np.abs(ref)) if ref.size else 0.0
+        diff = np.max(np.abs(np.asarray(data[key], dtype=np.float64) - ref)) if ref.size else 0.0
+        errors[key] = float(diff / scale) if scale > 0 else float(diff)
+    return errors
@@ -0,0 +1,245 @@
+"""Streaming sweeps: results are calculated and consumed chunk by chunk."""
+
+import numpy as np
+from calculations.results import compute_results
+
+
+# Default number of sweep steps calculated per chunk
+CHUNK_SIZE = 2**16
+
+
+def linspace_chunks(start, end, step, chunk_size=CHUNK_SIZE):
+    """
+    Generate the values of np.linspace(start, end, step) in chunks, without creating the full array.
+
+    Parameters
+    ----------
+    start : float
+        First value of the sweep
+    end : float
+        Last value of the sweep
+    step : int
+        Number of values in the sweep
+    chunk_size : int, optional
+        Maximum number of values per chunk, by default CHUNK_SIZE
+
+    Yields
+    ------
+    numpy.ndarray
+        Consecutive chunks of the sweep values, equal to the corresponding slices of np.linspace
+    """
+    delta = (end - start) / (step - 1) if step > 1 else 0.0
+    for first in range(0, step, chunk_size):
+        values = np.arange(first, min(first + chunk_size, step), dtype=np.float64) * delta + start
+        if step > 1 and first + values.size == step:
+            values[-1] = end
+        yield values
+
+
+def iter_sweep(
+    changing_param, values, performance_params, chunk_size=CHUNK_SIZE, dtype="float64", compact=False, backend=None
+):
+    """
+    Calculate the bounds for recall rate and average protocol time over a sweep, one chunk at a time.
+
+    Parameters
+    ----------
+    changing_param : str
+        Name of the parameter being varied in the analysis
+    values : array_like or iterator of array_like
+        Values of the changing parameter. An array is split into chunks of chunk_size values,
+        an iterator (e.g. from linspace_chunks) is consumed chunk by chunk as it is.
+    performance_params : dict
+        Dictionary containing the fixed performance parameters
+    chunk_size : int, optional
+        Maximum number of values per chunk when values is an array, by default CHUNK_SIZE
+    dtype : str or numpy.dtype, optional
+        Data type of the stored outputs, by default 'float64'
+    compact : bool, optional
+        If True, constant and derived outputs are not stored, by default False
+    backend : {'auto', 'numpy', 'numba'}, optional
+        Implementation of the bound calculation, by default the default backend
+        (see calculations.backends.resolve_backend)
+
+    Yields
+    ------
+    dict
+        Results for one chunk of the sweep, as returned by compute_results
+    """
+    if isinstance(values, (list, tuple, np.ndarray)):
+        values = np.asarray(values, dtype=np.float64)
+        chunks = (values[first : first + chunk_size] for first in range(0, values.size, chunk_size))
+    else:
+        chunks = values
+    for chunk in chunks:
+        yield compute_results(changing_param, chunk, performance_params, dtype=dtype, compact=compact, backend=backend)
+
+
+def iter_param_range(changing_param, param_range, performance_params, chunk_size=CHUNK_SIZE, **kwargs):
+    """
+    Stream the sweep described by a 'parameter_range' entry of changing_parameters.toml.
+
+    Parameters
+    ----------
+    changing_param : str
+        Name of the parameter being varied in the analysis
+    param_range : dict
+        Dictionary with 'start', 'end', and 'step' values
+    performance_params : dict
+        Dictionary containing the fixed performance parameters
+    chunk_size : int, optional
+        Maximum number of values per chunk, by default CHUNK_SIZE
+    **kwargs : dict
+        Passed on to iter_sweep ('dtype', 'compact', 'backend')
+
+    Yields
+    ------
+    dict
+        Results for one chunk of the sweep, as returned by compute_results
+    """
+    values = linspace_chunks(param_range["start"], param_range["end"], param_range["step"], chunk_size)
+    yield from iter_sweep(changing_param, values, performance_params, **kwargs)
+
+
+def _take(chunk, stop):
+    return {key: values[:stop] for key, values in chunk.items()}
+
+
+def until_crossing(stream, key, target):
+    """
+    Pass chunks on until an output crosses a target value, then stop the sweep.
+
+    Parameters
+    ----------
+    stream : iterator of dict
+        Sweep chunks, e.g. from iter_sweep
+    key : str
+        Name of the output to monitor, e.g. 'recall_ai_worst_case'
+    target : float
+        Value at which the sweep stops
+
+    Yields
+    ------
+    dict
+        Sweep chunks. The last chunk is cut off just after the first step on the other
+        side of target than the first step of the sweep that is not at target.
+    """
+    start_side = None
+    for chunk in stream:
+        side = np.sign(np.asarray(chunk[key], dtype=np.float64) - target)
+        if start_side is None:
+            # Steps at target before the sweep leaves it have no side yet
+            away = np.flatnonzero(side)
+            if not away.size:
+                yield chunk
+                continue
+            start_side = side[away[0]]
+            side[: away[0]] = start_side
+        crossed = np.flatnonzero(side != start_side)
+        if crossed.size:
+            yield _take(chunk, crossed[0] + 1)
+            return
+        yield chunk
+
+
+def with_progress(stream, callback, total=None):
+    """
+    Pass chunks on, reporting the number of processed sweep steps after each chunk.
+
+    Parameters
+    ----------
+    stream : iterator of dict
+        Sweep chunks, e.g. from iter_sweep
+    callback : callable
+        Called as callback(done, total) after every chunk
+    total : int, optional
+        Total number of sweep steps, passed on to callback, by default None
+
+    Yields
+    ------
+    dict
+        The unchanged sweep chunks
+    """
+    done = 0
+    for chunk in stream:
+        done += len(next(iter(chunk.values())))
+        callback(done, total)
+        yield chunk
+
+
+def decimate(stream, every):
+    """
+    Pass on every n-th sweep step, e.g. to plot a very long sweep at screen resolution.
+
+    Parameters
+    ----------
+    stream : iterator of dict
+        Sweep chunks, e.g. from iter_sweep
+    every : int
+        Keep one step out of every sweep steps, counted over the whole sweep
+
+    Yields
+    ------
+    dict
+        Chunks with the kept sweep steps
+    """
+    offset = 0
+    for chunk in stream:
+        size = len(next(iter(chunk.values())))
+        first = -offset % every
+        yield {key: values[first::every] for key, values in chunk.items()}
+        offset += size
+
+
+def collect(stream):
+    """
+    Concatenate all chunks of a stream into one result.
+
+    Parameters
+    ----------
+    stream : iterator of dict
+        Sweep chunks, e.g. from iter_sweep
+
+    Returns
+    -------
+    dict
+        Dictionary with one array per key, covering every chunk of the stream
+    """
+    chunks = {}
+    for chunk in stream:
+        for key, values in chunk.items():
+            chunks.setdefault(key, []).append(values)
+    return {key: np.concatenate(values) for key, values in chunks.items()}
+
+
+def summarize(stream):
+    """
+    Calculate the minimum, maximum and mean of every key of a stream.
+
+    Parameters
+    ----------
+    stream : iterator of dict
+        Sweep chunks, e.g. from iter_sweep
+
+    Returns
+    -------
+    dict
+        Dictionary with a dict of 'min', 'max' and 'mean' per key
+    """
+    summary = {}
+    count = 0
+    for chunk in stream:
+        size = len(next(iter(chunk.values())))
+        if not size:
+            continue
+        for key, values in chunk.items():
+            values = np.asarray(values, dtype=np.float64)
+            stats = summary.setdefault(key, {"min": np.inf, "max": -np.inf, "sum": 0.0})
+            stats["min"] = min(stats["min"], values.min())
+            stats["max"] = max(stats["max"], values.max())
+            stats["sum"] += values.sum()
+        count += size
+    return {
+        key: {"min": float(stats["min"]), "max": float(stats["max"]), "mean": float(stats["sum"] / count)}
+        for key, stats in summary.items()
+    }
@@ -0,0 +1,154 @@
+import argparse
+import json
+import sys
+from functools import partial
+from pathlib import Path
+from utils.parameter_loader import load_parameters
+from utils.paths import CHANGING_PARAMETERS_PATH, PLOT_PARAMETERS_PATH
+from utils.plan import compile_parameters
+from utils.result_store import open_result_store
+from calculations.compare import compare_result_sets, config_diff, diff_summary, store_diff
+from figures.create_figures import create_diff_figure
+
+
+def _compile_version(performance_path, changing_path, plot_params):
+    """Validate one version of the configuration the way main.py does, and compile it into a plan."""
+    try:
+        return compile_parameters(load_parameters(performance_path), load_parameters(changing_path), plot_params)
+    except ValueError as error:
+        raise ValueError(f"{performance_path} with {changing_path}: {error}") from None
+
+
+def _config_comparisons(plan_a, plan_b):
+    """Yield (changing_param, length, diff stream factory) for every sweep planned in both versions."""
+    changing_params_b = plan_b.changing_params
+    for changing_param, param_dict in plan_a.changing_params.items():
+        if changing_param not in changing_params_b:
+            continue
+        range_a = param_dict["parameter_range"]
+        range_b = changing_params_b[changing_param]["parameter_range"]
+        diff_stream = partial(
+            config_diff, changing_param, plan_a.performance_params, plan_b.performance_params, range_a, range_b
+        )
+        yield changing_param, range_a["step"], diff_stream
+
+
+def compare(
+    save_dir=None,
+    a=None,
+    b=None,
+    performance_a=None,
+    performance_b=None,
+    changing_a=CHANGING_PARAMETERS_PATH,
+    changing_b=None,
+    tolerance=None,
+):
+    """
+    Compare two result sets or two configurations, sweep by sweep and output by output.
+
+    Parameters
+    ----------
+    save_dir : str or Path, optional
+        Directory where diff figures and comparison.json are saved, by default nothing is saved
+    a : str or Path, optional
+        Directory with the reference result stores, one sub-directory per sweep. Stores are
+        matched, reported and named in comparison.json and the diff figures by sub-directory name.
+    b : str or Path, optional
+        Directory with the compared result stores
+    performance_a : str or Path, optional
+        Reference performance_parameters.toml, used when no result stores are given
+    performance_b : str or Path, optional
+        Compared performance_parameters.toml
+    changing_a : str or Path, optional
+        Reference changing_parameters.toml, by default the one in configs. Also provides
+        the parameter names of the diff figures.
+    changing_b : str or Path, optional
+        Compared changing_parameters.toml, by default changing_a
+    tolerance : float, optional
+        Largest accepted absolute difference of any output, by default None (no check)
+
+    Returns
+    -------
+    bool
+        False if any difference exceeds tolerance, True otherwise
+
+    Notes
+    -----
+    Every sweep is streamed chunk by chunk; with save_dir, it is streamed a second time
+    to draw its diff figure from at most the configured number of points.
+    """
+    if save_dir is not None:
+        Path(save_dir).mkdir(parents=True, exist_ok=True)
+
+    # Result stores are keyed by directory name, sweeps of two configurations by changing parameter
+    comparisons = {}
+    plan = None
+    if a is not None:
+        changing_params = load_parameters(changing_a)
+        summaries = compare_result_sets(a, b)
+        for name in summaries:
+            _, info = open_result_store(Path(a) / name)
+            diff_stream = partial(store_diff, Path(a) / name, Path(b) / name)
+            comparisons[name] = (info["changing_param"], info["length"], diff_stream)
+    else:
+        # Validate both versions before any sweep is calculated
+        plot_params = load_parameters(PLOT_PARAMETERS_PATH)
+        plan = _compile_version(performance_a, changing_a, plot_params)
+        plan_b = _compile_version(performance_b, changing_b or changing_a, plot_params)
+        changing_params = plan.changing_params
+        summaries = {}
+        for changing_param, length, diff_stream in _config_comparisons(plan, plan_b):
+            summaries[changing_param] = diff_summary(diff_stream(), changing_param)
+            comparisons[changing_param] = (changing_param, length, diff_stream)
+
+    passed = True
+    for name, (changing_param, length, diff_stream) in comparisons.items():
+        for key, stats in summaries[name].items():
+            failed = tolerance is not None and stats["max"] > tolerance
+            passed &= not failed
+            print(
+                f"{name:<18} {key:<24} max={stats['max']:<10.4g} mean={stats['mean']:<10.4g} "
+                f"at {changing_param}={stats['location']:.6g}{'  FAIL' if failed else ''}"
+            )
+        if save_dir is not None:
+            param_dict = changing_params.get(changing_param, {"name": changing_param})
+            figure_name = name if a is not None else None
+            create_diff_figure(
+                diff_stream(), changing_param, param_dict, save_dir, length, name=figure_name, plan=plan
+            )
+
+    if save_dir is not None:
+        with open(Path(save_dir) / "comparison.json", "w") as file:
+            json.dump(summaries, file, indent=2)
+    return passed
+
+
+if __name__ == "__main__":
+    # Parse command line arguments inside the __main__ block
+    parser = argparse.ArgumentParser(description="Compare two result sets or two configurations.")
+    parser.add_argument("--save_dir", type=str, default=None, help="Directory to save diff figures and the summary")
+    parser.add_argument("--a", type=str, default=None, help="Directory with the reference result stores")
+    parser.add_argument("--b", type=str, default=None, help="Directory with the compared result stores")
+    parser.add_argument("--performance_a", type=str, default=None, help="Reference performance_parameters.toml")
+    parser.add_argument("--performance_b", type=str, default=None, help="Compared performance_parameters.toml")
+    parser.add_argument(
+        "--changing_a", type=str, default=str(CHANGING_PARAMETERS_PATH), help="Reference changing_parameters.toml"
+    )
+    parser.add_argument("--changing_b", type=str, default=None, help="Compared changing_parameters.toml")
+    parser.add_argument("--tolerance", type=float, default=None, help="Fail if any difference exceeds this value")
+    args = parser.parse_args()
+    if (args.a is None) != (args.b is None) or (args.a is None and None in (args.performance_a, args.performance_b)):
+        parser.error("give either --a and --b, or --performance_a and --performance_b")
+
+    # Call the compare function with the parsed arguments
+    passed = compare(
+        args.save_dir,
+        a=args.a,
+        b=args.b,
+        performance_a=args.performance_a,
+        performance_b=args.performance_b,
+        changing_a=args.changing_a,
+        changing_b=args.changing_b,
+        tolerance=args.tolerance,
+    )
+    sys.exit(0 if passed else 1)
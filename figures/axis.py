@@ -0,0 +1,26 @@
+"""Axis formatting shared by the figure functions."""
+
+from matplotlib.ticker import FuncFormatter
+from utils.plan import TIME_PARAMETERS
+
+
+def format_axis(axis, changing_param, param_dict, label_size):
+    """
+    Label a parameter axis, showing fractions as percentages and durations in seconds.
+
+    Parameters
+    ----------
+    axis : matplotlib.axis.Axis
+        Axis to label, e.g. ax.xaxis
+    changing_param : str
+        Name of the parameter shown on the axis
+    param_dict : dict
+        Dictionary containing parameter information including 'name' for the axis label
+    label_size : int
+        Font size of the axis label
+    """
+    if changing_param in TIME_PARAMETERS:
+        axis.set_label_text(f"{param_dict['name']} (s)", fontsize=label_size)
+    else:
+        axis.set_label_text(f"{param_dict['name']} (%)", fontsize=label_size)
+        axis.set_major_formatter(FuncFormatter(lambda x, pos: f"{int(round(x * 100))}"))
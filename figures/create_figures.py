@@ -1,14 +1,53 @@
 import numpy as np
 from pathlib import Path
-from calculations.process_parameters import process_parameter_set
+from calculations.adaptive import adaptive_sample
+from calculations.economics import economics, load_sites, site_summary
+from calculations.grid import evaluate_surface
+from calculations.results import expand_results
+from calculations.sweep import collect, decimate, iter_param_range
 from utils.parameter_loader import load_parameters
-from utils.paths import PERFORMANCE_PARAMETERS_PATH
-from utils.save_figure import save_and_close_figure
+from utils.paths import ECONOMICS_PARAMETERS_PATH, PERFORMANCE_PARAMETERS_PATH, PLOT_PARAMETERS_PATH
+from utils.plan import sweep_figures
+from utils.result_store import store_chunks, write_result_store
+from utils.save_figure import save_and_close_figures
+from utils.site_table import write_site_table
+from figures.diff import diff_figure
+from figures.economics import cost_figure
 from figures.recall import standard_recall_figure
+from figures.surface import surface_figure
 from figures.time import standard_time_figure, time_diff_time_figure
 
 
-def create_figure(changing_param, param_dict, save_dir):
+# Figure functions by the kinds of figures in utils.plan.sweep_figures
+SWEEP_FIGURES = {
+    "recall": standard_recall_figure,
+    "time": standard_time_figure,
+    "time_diff": time_diff_time_figure,
+}
+
+
+def _save_figures(fig_list, save_dir, plot_params):
+    """Save figures in every format set in plot_parameters.toml and close them."""
+    save_and_close_figures(
+        fig_list,
+        save_dir,
+        formats=plot_params["format"],
+        dpi=plot_params["dpi"],
+        rasterize_bands=plot_params["rasterize_bands"],
+        workers=plot_params["save_workers"],
+    )
+
+
+def _load_parameters(plan=None):
+    """Return the performance and plot parameters of a compiled plan, or load them from their TOML files."""
+    if plan is not None:
+        return plan.performance_params, plan.plot_params
+    return load_parameters(PERFORMANCE_PARAMETERS_PATH), load_parameters(PLOT_PARAMETERS_PATH)
+
+
+def create_figure(
+    changing_param, param_dict, save_dir, dtype="float64", compact=False, band=None, plan=None, store_dir=None
+):
     """
     Create figures for recall rate and average protocol time based on changing parameters.
 
@@ -18,14 +57,30 @@ def create_figure(changing_param, param_dict, save_dir):
         Name of the parameter being varied in the analysis
     param_dict : dict
         Dictionary containing parameter range information with keys:
-        'parameter_range': dict with 'start', 'end', and 'step' values
+        'parameter_range': dict with 'start', 'end', and 'step' values, and optionally
+        'sampling' ('linspace' or 'adaptive') and 'tolerance'. With adaptive sampling,
+        'step' is the maximum number of points.
     save_dir : Path or str
         Directory where the generated figures will be saved
+    dtype : str or numpy.dtype, optional
+        Data type used to store the results, by default 'float64'
+    compact : bool, optional
+        If True, constant and derived outputs are not stored per step, by default False
+    band : tuple of float, optional
+        Position (lower, upper) of the shaded empirical band between the worst and best case,
+        e.g. from calculations.bootstrap.band_interval, by default the 'band' in plot_parameters.toml
+    plan : utils.plan.ScenarioPlan, optional
+        Compiled configuration providing the performance and plot parameters,
+        by default they are loaded from their TOML files
+    store_dir : Path or str, optional
+        If given, the sweep is also written to the result store store_dir / changing_param
+        as it is calculated, e.g. for compare.py, by default nothing is stored
 
     Returns
     -------
-    None
-        Figures are saved to the specified directory
+    dict
+        The sweep results the figures were created from, e.g. for create_economics_figure.
+        Figures are saved to the specified directory.
 
     Notes
     -----
@@ -33,43 +88,189 @@ def create_figure(changing_param, param_dict, save_dir):
     - For time-related parameters ('full_time', 'abbr_time'): creates time difference plots
     - For other parameters: creates standard recall and time plots
     """
-    # Import standard performance parameters
-    performance_params = load_parameters(PERFORMANCE_PARAMETERS_PATH)
+    # Import standard performance and plot parameters
+    performance_params, plot_params = _load_parameters(plan)
 
     # Calculate bounds for recall rate and average protocol time at every step
     param_range = param_dict["parameter_range"]
-    data = {
-        "recall_ai_best_case": [],
-        "recall_ai_worst_case": [],
-        "recall_abbr": [],
-        "recall_full": [],
-        "avg_time_ai_best_case": [],
-        "avg_time_ai_worst_case": [],
-        "avg_time_abbr": [],
-        "avg_time_full": [],
-        changing_param: [],
-    }
-    for value in np.linspace(param_range["start"], param_range["end"], param_range["step"]):
-        # Update the changing parameter in parameter set
-        performance_params[changing_param] = value
-        # Calculate the recall and time for parameter set
-        new_data = process_parameter_set(**performance_params)
-        # Append the results to the data dict
-        for key in data.keys():
-            if key == changing_param:
-                data[key].append(value)
-            else:
-                data[key].append(new_data[key])
+    if param_range.get("sampling", "linspace") == "adaptive":
+        data = adaptive_sample(
+            changing_param,
+            param_range["start"],
+            param_range["end"],
+            performance_params,
+            tolerance=param_range.get("tolerance", 1e-3),
+            max_points=param_range["step"],
+            dtype=dtype,
+            compact=compact,
+        )
+        if store_dir is not None:
+            write_result_store([data], Path(store_dir) / changing_param, changing_param, metadata=performance_params)
+    else:
+        stream = iter_param_range(changing_param, param_range, performance_params, dtype=dtype, compact=compact)
+        if store_dir is not None:
+            stream = store_chunks(stream, Path(store_dir) / changing_param, changing_param, metadata=performance_params)
+        data = collect(stream)
+    # Restore constant outputs as zero-copy views for plotting
+    data = expand_results(data, changing_param, performance_params)
 
     # Create figures
     fig_list = []
-    if changing_param in ["full_time", "abbr_time"]:
-        fig_list.append(time_diff_time_figure(data, changing_param, param_dict, performance_params))
+    for kind in sweep_figures(changing_param):
+        figure_function = SWEEP_FIGURES[kind]
+        # Every figure gets its own copy of the dictionary, the returned results stay unchanged
+        fig_list.append(figure_function(dict(data), changing_param, param_dict, performance_params, band, plot_params))
+
+    _save_figures(fig_list, save_dir, plot_params)
+    return data
+
+
+def create_surface_figure(surface_dict, changing_params, save_dir, plan=None, workers=None):
+    """
+    Create a surface figure showing the joint effect of two changing parameters.
+
+    Parameters
+    ----------
+    surface_dict : dict
+        Dictionary containing the surface definition with keys:
+        'x' and 'y': names of the parameters varied along the axes
+        'step': number of grid points per axis
+    changing_params : dict
+        Dictionary containing the parameter information of every changing parameter,
+        as loaded from changing_parameters.toml
+    save_dir : Path or str
+        Directory where the generated figure will be saved
+    plan : utils.plan.ScenarioPlan, optional
+        Compiled configuration providing the performance and plot parameters,
+        by default they are loaded from their TOML files
+    workers : int, optional
+        Number of worker processes evaluating the grid, by default None (a single process)
+
+    Returns
+    -------
+    None
+        The figure is saved to the specified directory
+
+    Notes
+    -----
+    Grids with more points than the 'resolution' set in plot_parameters.toml are averaged
+    down to that resolution before plotting.
+    """
+    # Import standard performance and plot parameters
+    performance_params, plot_params = _load_parameters(plan)
+
+    # Calculate the surface on the grid spanned by both parameters
+    x_param, y_param = surface_dict["x"], surface_dict["y"]
+    x_range = changing_params[x_param]["parameter_range"]
+    y_range = changing_params[y_param]["parameter_range"]
+    surface = evaluate_surface(
+        x_param,
+        np.linspace(x_range["start"], x_range["end"], surface_dict["step"]),
+        y_param,
+        np.linspace(y_range["start"], y_range["end"], surface_dict["step"]),
+        performance_params,
+        resolution=plot_params["surface"]["resolution"],
+        workers=workers,
+    )
+
+    # Create and save figure
+    fig_dict = surface_figure(
+        surface,
+        x_param,
+        changing_params[x_param],
+        y_param,
+        changing_params[y_param],
+        performance_params,
+        plot_params=plot_params,
+    )
+    _save_figures([fig_dict], save_dir, plot_params)
+
+
+def create_economics_figure(data, changing_param, param_dict, save_dir, plan=None):
+    """
+    Create cost figures for every site in economics_parameters.toml and export a site table.
+
+    Parameters
+    ----------
+    data : dict
+        Sweep results with every key in calculations.results.OUTPUT_KEYS, as returned by create_figure
+    changing_param : str
+        Name of the parameter being varied in the analysis
+    param_dict : dict
+        Dictionary containing parameter information including 'name' for axis label
+    save_dir : Path or str
+        Directory where the generated figures and the site table will be saved
+    plan : utils.plan.ScenarioPlan, optional
+        Compiled configuration providing the performance, plot and economics parameters,
+        by default they are loaded from their TOML files
+
+    Returns
+    -------
+    None
+        Figures and '<changing_param>_economics.csv' are saved to the specified directory
+
+    Notes
+    -----
+    The bounds are not calculated again: all sites are priced from the results of the sweep.
+    """
+    # Import standard performance, plot and economics parameters
+    performance_params, plot_params = _load_parameters(plan)
+    if plan is not None and plan.economics is not None:
+        economics_params = plan.economics_params
     else:
-        fig_list.append(standard_recall_figure(data, changing_param, param_dict, performance_params))
-        fig_list.append(standard_time_figure(data, changing_param, param_dict, performance_params))
+        economics_params = load_parameters(ECONOMICS_PARAMETERS_PATH)
+    names, sites = load_sites(economics_params)
+
+    # Price every site along the sweep
+    costs = economics(data, performance_params, sites, changing_param=changing_param)
+
+    # Create and save figures
+    fig_list = []
+    for index, name in enumerate(names):
+        site_costs = {key: values[index] for key, values in costs.items()}
+        fig_list.append(cost_figure(site_costs, changing_param, param_dict, name, data[changing_param], plot_params))
+    _save_figures(fig_list, save_dir, plot_params)
+
+    # Export the summary of every site
+    summary = site_summary(names, sites, data, changing_param, performance_params)
+    write_site_table(Path(save_dir) / f"{changing_param}_economics.csv", names, summary)
+
 
-    for fig_dict in fig_list:
-        fig = fig_dict["fig"]
-        name = fig_dict["name"]
-        save_and_close_figure(fig=fig, save_name=name, save_dir=save_dir)
+def create_diff_figure(diff_stream, changing_param, param_dict, save_dir, length, name=None, plan=None):
+    """
+    Create a figure of the differences between two versions of a sweep.
+
+    Parameters
+    ----------
+    diff_stream : iterator of dict
+        Difference chunks, as yielded by calculations.compare.iter_diff
+    changing_param : str
+        Name of the parameter being varied in the analysis
+    param_dict : dict
+        Dictionary containing parameter information including 'name' for axis label
+    save_dir : Path or str
+        Directory where the generated figure will be saved
+    length : int
+        Number of sweep steps in diff_stream, used to decimate long sweeps
+    name : str, optional
+        Name of the comparison, added to the title and the filename, by default None
+    plan : utils.plan.ScenarioPlan, optional
+        Compiled configuration providing the plot parameters, by default they are loaded
+        from plot_parameters.toml
+
+    Returns
+    -------
+    None
+        The figure is saved to the specified directory
+
+    Notes
+    -----
+    At most the number of 'points' in the [diff] table of plot_parameters.toml are plotted,
+    so only the decimated differences are held in memory.
+    """
+    plot_params = plan.plot_params if plan is not None else load_parameters(PLOT_PARAMETERS_PATH)
+    every = max(1, -(-length // plot_params["diff"]["points"]))
+    diff = collect(decimate(diff_stream, every))
+    if not diff:
+        return
+    _save_figures([diff_figure(diff, changing_param, param_dict, name, plot_params)], save_dir, plot_params)
@@ -0,0 +1,75 @@
+import matplotlib.pyplot as plt
+from utils.parameter_loader import load_parameters
+from utils.paths import PLOT_PARAMETERS_PATH
+from figures.axis import format_axis
+
+
+# Line style per protocol, shared by the recall and time panels
+_PROTOCOL_STYLES = (
+    ("ai_best_case", "Adaptive, best case", "ai", "-"),
+    ("ai_worst_case", "Adaptive, worst case", "ai", "--"),
+    ("abbr", "Abbreviated", "abbr", "-"),
+    ("full", "Full", "full", "-"),
+)
+
+
+def diff_figure(diff, changing_param, param_dict, name=None, plot_params=None):
+    """
+    Create a figure showing how recall rates and average protocol times moved between two sweeps.
+
+    Parameters
+    ----------
+    diff : dict
+        Differences b - a as yielded by calculations.compare.iter_diff, with the
+        changing parameter values under the changing parameter name
+    changing_param : str
+        Name of the parameter being varied in the analysis
+    param_dict : dict
+        Dictionary containing parameter information including 'name' for axis label
+    name : str, optional
+        Name of the comparison, added to the title and the filename
+    plot_params : dict, optional
+        Plot parameters, e.g. from utils.plan.ScenarioPlan, by default loaded from plot_parameters.toml
+
+    Returns
+    -------
+    dict
+        Dictionary containing:
+        'fig' : matplotlib.figure.Figure
+            The generated figure object
+        'name' : str
+            The filename for saving the figure, without extension
+
+    Notes
+    -----
+    Outputs that are not present in diff (e.g. dropped from compact result stores) are left out.
+    """
+    # load params
+    params = load_parameters(PLOT_PARAMETERS_PATH) if plot_params is None else dict(plot_params)
+
+    # Create figure
+    fig, axes = plt.subplots(1, 2, figsize=(20, 6), constrained_layout=True)
+    panels = (("recall", "Recall rate difference (%)", 100), ("avg_time", "Average time difference (s)", 1))
+    for ax, (prefix, label, scale) in zip(axes, panels):
+        for protocol, protocol_name, color, linestyle in _PROTOCOL_STYLES:
+            key = f"{prefix}_{protocol}"
+            if key not in diff:
+                continue
+            ax.plot(
+                diff[changing_param],
+                diff[key] * scale,
+                linestyle,
+                label=protocol_name,
+                linewidth=params["linewidth"],
+                color=params["colors"][color],
+            )
+        ax.axhline(0, color="black", linewidth=0.5)
+        format_axis(ax.xaxis, changing_param, param_dict, params["label_size"])
+        ax.set_ylabel(label, fontsize=params["label_size"])
+        ax.tick_params(axis="both", labelsize=params["tick_size"])
+
+    axes[0].legend(fontsize=params["legend_size"])
+    title = f"Changes in {param_dict['name']} sweep"
+    fig.suptitle(f"{title}: {name}" if name else title, fontsize=params["title_size"])
+
+    return {"fig": fig, "name": f"{changing_param}_diff_{name}" if name else f"{changing_param}_diff"}
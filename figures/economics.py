@@ -0,0 +1,90 @@
+import matplotlib.pyplot as plt
+import numpy as np
+from calculations.economics import break_even
+from utils.parameter_loader import load_parameters
+from utils.paths import PLOT_PARAMETERS_PATH
+from figures.axis import format_axis
+
+
+def cost_figure(costs, changing_param, param_dict, site_name, values, plot_params=None):
+    """
+    Create a figure showing the cost per screen and the scanner hours saved at one site.
+
+    Parameters
+    ----------
+    costs : dict
+        Costs of one site as returned by calculations.economics.economics, with keys
+        'cost_per_screen_<protocol>' and 'scanner_hours_saved_<protocol>'
+    changing_param : str
+        Name of the parameter being varied in the analysis
+    param_dict : dict
+        Dictionary containing parameter information including 'name' for axis label
+    site_name : str
+        Name of the site, used in the title and the filename
+    values : array_like
+        Values of the changing parameter
+    plot_params : dict, optional
+        Plot parameters, e.g. from utils.plan.ScenarioPlan, by default loaded from plot_parameters.toml
+
+    Returns
+    -------
+    dict
+        Dictionary containing:
+        'fig' : matplotlib.figure.Figure
+            The generated figure object
+        'name' : str
+            The filename for saving the figure, without extension
+
+    Notes
+    -----
+    The left panel shows the cost per screen of the Adaptive (with best/worst case range),
+    Abbreviated and Full protocols, the right panel the scanner hours per year saved compared
+    to the Full protocol. Dotted vertical lines mark where the Adaptive protocol costs as much
+    as the Abbreviated protocol.
+    """
+    # load params
+    params = load_parameters(PLOT_PARAMETERS_PATH) if plot_params is None else dict(plot_params)
+
+    # Create figure
+    fig, axes = plt.subplots(1, 2, figsize=(20, 6), constrained_layout=True)
+    panels = (
+        ("cost_per_screen", "Cost per screen"),
+        ("scanner_hours_saved", "Scanner hours saved per year"),
+    )
+    for ax, (prefix, label) in zip(axes, panels):
+        for protocol, name, color in (
+            ("abbr", "Abbreviated", params["colors"]["abbr"]),
+            ("full", "Full", params["colors"]["full"]),
+        ):
+            ax.plot(values, costs[f"{prefix}_{protocol}"], label=name, linewidth=params["linewidth"], color=color)
+        ax.plot(
+            values,
+            costs[f"{prefix}_ai_best_case"],
+            label="Adaptive",
+            linewidth=params["linewidth"],
+            color=params["colors"]["ai"],
+        )
+        ax.plot(values, costs[f"{prefix}_ai_worst_case"], linewidth=params["linewidth"], color=params["colors"]["ai"])
+        ax.fill_between(
+            values,
+            costs[f"{prefix}_ai_best_case"],
+            costs[f"{prefix}_ai_worst_case"],
+            color=params["colors"]["ai"],
+            alpha=params["colors"]["ai_alpha"],
+        )
+        format_axis(ax.xaxis, changing_param, param_dict, params["label_size"])
+        ax.set_ylabel(label, fontsize=params["label_size"])
+        ax.tick_params(axis="both", labelsize=params["tick_size"])
+        ax.set_xlim(values[0], values[-1])
+
+    # Mark where the adaptive protocol breaks even with the abbreviated protocol
+    for case in ("ai_best_case", "ai_worst_case"):
+        value = break_even(values, costs, key=f"cost_per_screen_{case}")
+        if np.isfinite(value):
+            for ax in axes:
+                ax.axvline(value, linestyle=":", color=params["colors"]["ai"])
+
+    axes[0].legend(fontsize=params["legend_size"])
+    fig.suptitle(f"Protocol costs at {site_name}", fontsize=params["title_size"])
+
+    return {"fig": fig, "name": f"{changing_param}_cost_{site_name}"}
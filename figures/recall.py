@@ -5,7 +5,7 @@ from utils.paths import PLOT_PARAMETERS_PATH
 import numpy as np
 
 
-def standard_recall_figure(data, changing_param, param_dict, performance_params):
+def standard_recall_figure(data, changing_param, param_dict, performance_params, band=None, plot_params=None):
     """
     Create a figure showing recall rates for different protocols.
 
@@ -21,6 +21,11 @@ def standard_recall_figure(data, changing_param, param_dict, performance_params)
         Dictionary containing parameter information including 'name' for axis label
     performance_params : dict
         Dictionary containing performance parameters (not directly used in plotting)
+    band : tuple of float, optional
+        Position (lower, upper) of the shaded empirical band between the worst case (0) and
+        the best case (1), by default the 'band' set in plot_parameters.toml
+    plot_params : dict, optional
+        Plot parameters, e.g. from utils.plan.ScenarioPlan, by default loaded from plot_parameters.toml
 
     Returns
     -------
@@ -29,7 +34,7 @@ def standard_recall_figure(data, changing_param, param_dict, performance_params)
         'fig' : matplotlib.figure.Figure
             The generated figure object
         'name' : str
-            The filename for saving the figure
+            The filename for saving the figure, without extension
 
     Notes
     -----
@@ -38,7 +43,7 @@ def standard_recall_figure(data, changing_param, param_dict, performance_params)
     best and worst case scenarios for the Adaptive protocol.
     """
     # load params
-    params = load_parameters(PLOT_PARAMETERS_PATH)
+    params = load_parameters(PLOT_PARAMETERS_PATH) if plot_params is None else dict(plot_params)
     params["percentage_formatter"] = FuncFormatter(lambda x, pos: f"{x:.0%}")
 
     # Create figure
@@ -87,8 +92,9 @@ def standard_recall_figure(data, changing_param, param_dict, performance_params)
     best_case = np.array(data["recall_ai_best_case"])
     worst_case = np.array(data["recall_ai_worst_case"])
     diff = worst_case - best_case
-    lower_bound = worst_case - 0.76 * diff
-    upper_bound = worst_case - 0.91 * diff
+    lower, upper = params["band"] if band is None else band
+    lower_bound = worst_case - lower * diff
+    upper_bound = worst_case - upper * diff
     
     # Fill between confidence interval bounds
     ax.fill_between(data[changing_param], lower_bound, upper_bound,
@@ -124,4 +130,4 @@ def standard_recall_figure(data, changing_param, param_dict, performance_params)
     ax.grid(which="major", linestyle="-", linewidth=0.7)
     ax.grid(which="minor", linestyle=":", linewidth=0.5)
 
-    return {"fig": fig, "name": f"{changing_param}_recall.{params['format']}"}
+    return {"fig": fig, "name": f"{changing_param}_recall"}
@@ -0,0 +1,108 @@
+import matplotlib.pyplot as plt
+from matplotlib.colors import TwoSlopeNorm
+from matplotlib.lines import Line2D
+from matplotlib.ticker import FuncFormatter
+import numpy as np
+from utils.parameter_loader import load_parameters
+from utils.paths import PLOT_PARAMETERS_PATH
+from figures.axis import format_axis
+
+
+def surface_figure(surface, x_param, x_dict, y_param, y_dict, performance_params, plot_params=None):
+    """
+    Create a single-page figure showing the joint effect of two parameters on the adaptive protocol.
+
+    Parameters
+    ----------
+    surface : dict
+        Dictionary as returned by calculations.grid.evaluate_surface with keys:
+        'recall_gap', 'time_savings_best_case', 'time_savings_worst_case',
+        and the x and y parameter names
+    x_param : str
+        Name of the parameter varied along the x-axis
+    x_dict : dict
+        Dictionary containing parameter information including 'name' for the x-axis label
+    y_param : str
+        Name of the parameter varied along the y-axis
+    y_dict : dict
+        Dictionary containing parameter information including 'name' for the y-axis label
+    performance_params : dict
+        Dictionary containing performance parameters (not directly used in plotting)
+    plot_params : dict, optional
+        Plot parameters, e.g. from utils.plan.ScenarioPlan, by default loaded from plot_parameters.toml
+
+    Returns
+    -------
+    dict
+        Dictionary containing:
+        'fig' : matplotlib.figure.Figure
+            The generated figure object
+        'name' : str
+            The filename for saving the figure, without extension
+
+    Notes
+    -----
+    The figure has three panels: the gap between worst and best case recall rate of the
+    Adaptive protocol, and the time saved by the Adaptive protocol compared to the Abbreviated
+    protocol in the best and the worst case. The break-even contours, where the Adaptive
+    protocol takes as long as the Abbreviated protocol, are drawn on both time panels.
+    """
+    # load params
+    params = load_parameters(PLOT_PARAMETERS_PATH) if plot_params is None else dict(plot_params)
+    surface_params = params["surface"]
+
+    # Create figure
+    fig, axes = plt.subplots(1, 3, figsize=(20, 6), sharey=True, constrained_layout=True)
+    x = surface[x_param]
+    y = surface[y_param]
+
+    # Recall gap panel
+    mesh = axes[0].pcolormesh(
+        x, y, surface["recall_gap"], shading="nearest", cmap=surface_params["cmap"], rasterized=True
+    )
+    colorbar = fig.colorbar(mesh, ax=axes[0])
+    colorbar.ax.yaxis.set_major_formatter(FuncFormatter(lambda x, pos: f"{x * 100:.1f}"))
+    colorbar.set_label("Recall rate gap, worst - best case (%)", fontsize=params["label_size"])
+    colorbar.ax.tick_params(labelsize=params["tick_size"])
+    axes[0].set_title("Adaptive recall rate uncertainty", fontsize=params["title_size"])
+
+    # Time savings panels, centred on the break-even point
+    time_keys = ("time_savings_best_case", "time_savings_worst_case")
+    limit = max(np.nanmax(np.abs(surface[key])) for key in time_keys) or 1.0
+    norm = TwoSlopeNorm(vcenter=0.0, vmin=-limit, vmax=limit)
+    for ax, key, title in zip(axes[1:], time_keys, ["best case", "worst case"]):
+        mesh = ax.pcolormesh(
+            x, y, surface[key], shading="nearest", cmap=surface_params["diverging_cmap"], norm=norm, rasterized=True
+        )
+        ax.set_title(f"Time saved vs Abbreviated, {title}", fontsize=params["title_size"])
+        for contour_key, linestyle in zip(time_keys, ["-", "--"]):
+            if np.nanmin(surface[contour_key]) < 0 < np.nanmax(surface[contour_key]):
+                ax.contour(
+                    x,
+                    y,
+                    surface[contour_key],
+                    levels=[0.0],
+                    colors=params["colors"]["ai"],
+                    linewidths=params["linewidth"],
+                    linestyles=linestyle,
+                )
+    colorbar = fig.colorbar(mesh, ax=axes[1:])
+    colorbar.set_label("Time saved per patient (s)", fontsize=params["label_size"])
+    colorbar.ax.tick_params(labelsize=params["tick_size"])
+    axes[2].legend(
+        handles=[
+            Line2D([], [], color=params["colors"]["ai"], linewidth=params["linewidth"], linestyle="-"),
+            Line2D([], [], color=params["colors"]["ai"], linewidth=params["linewidth"], linestyle="--"),
+        ],
+        labels=["Break-even, best case", "Break-even, worst case"],
+        loc="lower left",
+        fontsize=params["legend_size"],
+    )
+
+    # Labels and axes
+    for ax in axes:
+        format_axis(ax.xaxis, x_param, x_dict, params["label_size"])
+        ax.tick_params(axis="both", labelsize=params["tick_size"])
+    format_axis(axes[0].yaxis, y_param, y_dict, params["label_size"])
+
+    return {"fig": fig, "name": f"{x_param}_{y_param}_surface"}
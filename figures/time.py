@@ -5,7 +5,7 @@ from utils.parameter_loader import load_parameters
 from utils.paths import PLOT_PARAMETERS_PATH
 
 
-def standard_time_figure(data, changing_param, param_dict, performance_params):
+def standard_time_figure(data, changing_param, param_dict, performance_params, band=None, plot_params=None):
     """
     Create a figure showing average protocol times for different protocols.
 
@@ -21,6 +21,11 @@ def standard_time_figure(data, changing_param, param_dict, performance_params):
         Dictionary containing parameter information including 'name' for axis label
     performance_params : dict
         Dictionary containing performance parameters (not directly used in plotting)
+    band : tuple of float, optional
+        Position (lower, upper) of the shaded empirical band between the worst case (0) and
+        the best case (1), by default the 'band' set in plot_parameters.toml
+    plot_params : dict, optional
+        Plot parameters, e.g. from utils.plan.ScenarioPlan, by default loaded from plot_parameters.toml
 
     Returns
     -------
@@ -29,7 +34,7 @@ def standard_time_figure(data, changing_param, param_dict, performance_params):
         'fig' : matplotlib.figure.Figure
             The generated figure object
         'name' : str
-            The filename for saving the figure
+            The filename for saving the figure, without extension
 
     Notes
     -----
@@ -39,7 +44,7 @@ def standard_time_figure(data, changing_param, param_dict, performance_params):
     to better visualize the differences.
     """
     # load params
-    params = load_parameters(PLOT_PARAMETERS_PATH)
+    params = load_parameters(PLOT_PARAMETERS_PATH) if plot_params is None else dict(plot_params)
     params["percentage_formatter"] = FuncFormatter(lambda x, pos: f"{x:.0%}")
 
     # Create figure
@@ -88,8 +93,9 @@ def standard_time_figure(data, changing_param, param_dict, performance_params):
     best_case = np.array(data["avg_time_ai_best_case"])
     worst_case = np.array(data["avg_time_ai_worst_case"])
     diff = worst_case - best_case
-    lower_bound = worst_case - 0.76 * diff
-    upper_bound = worst_case - 0.91 * diff
+    lower, upper = params["band"] if band is None else band
+    lower_bound = worst_case - lower * diff
+    upper_bound = worst_case - upper * diff
     
     # Fill between confidence interval bounds
     ax.fill_between(data[changing_param], lower_bound, upper_bound,
@@ -151,10 +157,10 @@ def standard_time_figure(data, changing_param, param_dict, performance_params):
             )
         )
 
-    return {"fig": fig, "name": f"{changing_param}_time.{params['format']}"}
+    return {"fig": fig, "name": f"{changing_param}_time"}
 
 
-def time_diff_time_figure(data, changing_param, param_dict, performance_params):
+def time_diff_time_figure(data, changing_param, param_dict, performance_params, band=None, plot_params=None):
     """
     Create a figure showing relative protocol times as percentages of full protocol duration.
 
@@ -170,6 +176,11 @@ def time_diff_time_figure(data, changing_param, param_dict, performance_params):
         Dictionary containing parameter information including 'name' for axis label
     performance_params : dict
         Dictionary containing performance parameters (not directly used in plotting)
+    band : tuple of float, optional
+        Position (lower, upper) of the shaded empirical band between the worst case (0) and
+        the best case (1), by default the 'band' set in plot_parameters.toml
+    plot_params : dict, optional
+        Plot parameters, e.g. from utils.plan.ScenarioPlan, by default loaded from plot_parameters.toml
 
     Returns
     -------
@@ -178,7 +189,7 @@ def time_diff_time_figure(data, changing_param, param_dict, performance_params):
         'fig' : matplotlib.figure.Figure
             The generated figure object
         'name' : str
-            The filename for saving the figure
+            The filename for saving the figure, without extension
 
     Notes
     -----
@@ -188,14 +199,13 @@ def time_diff_time_figure(data, changing_param, param_dict, performance_params):
     protocol and uses a cut-off y-axis starting at 15% to better visualize the differences.
     """
     # load params
-    params = load_parameters(PLOT_PARAMETERS_PATH)
+    params = load_parameters(PLOT_PARAMETERS_PATH) if plot_params is None else dict(plot_params)
     params["percentage_formatter"] = FuncFormatter(lambda x, pos: f"{x:.0%}")
 
-    # Change to percentage
-    data["avg_time_ai_best_case"] = [x / y for x, y in zip(data["avg_time_ai_best_case"], data["avg_time_full"])]
-    data["avg_time_ai_worst_case"] = [x / y for x, y in zip(data["avg_time_ai_worst_case"], data["avg_time_full"])]
-    data["avg_time_abbr"] = [x / y for x, y in zip(data["avg_time_abbr"], data["avg_time_full"])]
-    data["avg_time_full"] = [x / y for x, y in zip(data["avg_time_full"], data["avg_time_full"])]
+    # Change to percentage, in new arrays so that the results passed in stay unchanged
+    full_time = np.asarray(data["avg_time_full"], dtype=np.float64)
+    keys = ("avg_time_ai_best_case", "avg_time_ai_worst_case", "avg_time_abbr", "avg_time_full")
+    data = dict(data, **{key: np.asarray(data[key], dtype=np.float64) / full_time for key in keys})
 
     # Create figure
     fig, ax = plt.subplots(1, 1, figsize=(12, 6))
@@ -243,8 +253,9 @@ def time_diff_time_figure(data, changing_param, param_dict, performance_params):
     best_case = np.array(data["avg_time_ai_best_case"])
     worst_case = np.array(data["avg_time_ai_worst_case"])
     diff = worst_case - best_case
-    lower_bound = worst_case - 0.76 * diff
-    upper_bound = worst_case - 0.91 * diff
+    lower, upper = params["band"] if band is None else band
+    lower_bound = worst_case - lower * diff
+    upper_bound = worst_case - upper * diff
     
     # Fill between confidence interval bounds
     ax.fill_between(data[changing_param], lower_bound, upper_bound,
@@ -317,4 +328,4 @@ def time_diff_time_figure(data, changing_param, param_dict, performance_params):
     yticks = np.arange(0.2*100, ylim[1]*100, 0.1*100)
     ax.set_yticklabels([0] + [int(ytick) for ytick in yticks])
 
-    return {"fig": fig, "name": f"{changing_param}_time.{params['format']}"}
+    return {"fig": fig, "name": f"{changing_param}_time"}
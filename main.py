@@ -1,11 +1,22 @@
 import argparse
 from pathlib import Path
-from utils.parameter_loader import load_parameters
-from utils.paths import CHANGING_PARAMETERS_PATH
-from figures.create_figures import create_figure
+from utils.plan import compile_plan
+from utils.reader_study import load_reader_study
+from calculations.backends import set_default_backend
+from calculations.bootstrap import band_interval, bootstrap_reader_study
+from figures.create_figures import create_economics_figure, create_figure, create_surface_figure
 
 
-def main(save_dir):
+def main(
+    save_dir,
+    dtype="float64",
+    compact=False,
+    backend=None,
+    reader_study=None,
+    economics=False,
+    workers=None,
+    store_dir=None,
+):
     """
     Calculate all bounds for recall rate and average protocol time, and create all plots.
 
@@ -13,6 +24,25 @@ def main(save_dir):
     ----------
     save_dir : str or Path
         Directory path where the generated figures will be saved.
+    dtype : str, optional
+        Data type used to store the sweep results, by default 'float64'.
+    compact : bool, optional
+        If True, constant and derived outputs are not stored per step, by default False.
+    backend : str, optional
+        Implementation of the bound calculation ('auto', 'numpy' or 'numba'),
+        by default the ADAPTIVE_MRI_BOUNDS_BACKEND environment variable or 'numpy'.
+    reader_study : str or Path, optional
+        Per-case reader-study CSV file. If given, the shaded empirical band is the bootstrap
+        confidence interval of its position, instead of the 'band' in plot_parameters.toml.
+    economics : bool, optional
+        If True, also create cost figures and site tables for the parameters listed in
+        economics_parameters.toml, by default False. Raises ValueError if the compiled
+        configuration has no economics parameters.
+    workers : int, optional
+        Number of worker processes evaluating the surface grids, by default None (a single process).
+    store_dir : str or Path, optional
+        If given, every sweep is also written to a result store in a sub-directory named after
+        its changing parameter, e.g. for compare.py, by default nothing is stored.
 
     Returns
     -------
@@ -22,20 +52,57 @@ def main(save_dir):
     Notes
     -----
     This function performs the following steps:
-    1. Creates the save directory if it doesn't exist
-    2. Loads parameters from the changing_parameters.toml configuration file
+    1. Loads and validates all configuration files, failing before any calculation
+    2. Creates the save directory if it doesn't exist
     3. Generates and saves figures for each changing parameter
+    4. Generates and saves surface figures for each parameter pair in surface_parameters.toml
+    5. Optionally generates and saves cost figures and site tables
     """
+    # Validate the configuration and compile it into a plan, before any work is done
+    plan = compile_plan()
+    if economics and plan.economics_params is None:
+        raise ValueError("Economics figures were requested, but no economics_parameters.toml was compiled")
+
     # Ensure save directory exists
     save_path = Path(save_dir)
     save_path.mkdir(parents=True, exist_ok=True)
 
-    # Load parameters for changing parameters
-    changing_params = load_parameters(CHANGING_PARAMETERS_PATH)
+    # Select the implementation of the bound calculation
+    if backend is not None:
+        set_default_backend(backend)
+
+    # Estimate the position of the empirical band from per-case reader-study data
+    band = None
+    if reader_study is not None:
+        replicates = bootstrap_reader_study(load_reader_study(reader_study), plan.performance_params)
+        band = band_interval(replicates)
+        print(f"Empirical band position from {reader_study}: {band[0]:.3f} to {band[1]:.3f}")
+
+    # Create and save figures for each changing parameter, keeping the sweeps that are priced
+    priced = plan.economics_params["changing_params"] if economics else ()
+    sweeps = {}
+    for job in plan.sweeps:
+        data = create_figure(
+            job.changing_param,
+            job.param_dict,
+            save_path,
+            dtype=dtype,
+            compact=compact,
+            band=band,
+            plan=plan,
+            store_dir=store_dir,
+        )
+        if job.changing_param in priced:
+            sweeps[job.changing_param] = data
+
+    # Create and save figures for every pair of parameters in surface_parameters.toml
+    changing_params = plan.changing_params
+    for job in plan.surfaces:
+        create_surface_figure(job.surface_dict, changing_params, save_path, plan=plan, workers=workers)
 
-    # Create and save figures for each changing parameter
-    for changing_param, param_dict in changing_params.items():
-        create_figure(changing_param, param_dict, save_path)
+    # Create and save cost figures and site tables
+    for changing_param, data in sweeps.items():
+        create_economics_figure(data, changing_param, changing_params[changing_param], save_path, plan=plan)
 
     print(f"All figures generated and saved to {save_path}.")
 
@@ -44,7 +111,46 @@ if __name__ == "__main__":
     # Parse command line arguments inside the __main__ block
     parser = argparse.ArgumentParser(description="Generate and save figures.")
     parser.add_argument("--save_dir", type=str, required=True, help="Directory to save the figures")
+    parser.add_argument(
+        "--dtype",
+        type=str,
+        default="float64",
+        choices=["float64", "float32", "float16"],
+        help="Data type used to store the sweep results",
+    )
+    parser.add_argument("--compact", action="store_true", help="Do not store constant or derived outputs")
+    parser.add_argument(
+        "--backend",
+        type=str,
+        default=None,
+        choices=["auto", "numpy", "numba"],
+        help="Implementation of the bound calculation ('auto' uses Numba when installed)",
+    )
+    parser.add_argument(
+        "--reader_study",
+        type=str,
+        default=None,
+        help="Per-case reader-study CSV used to estimate the empirical band by bootstrapping",
+    )
+    parser.add_argument(
+        "--economics", action="store_true", help="Also create cost figures and site tables for every site"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=None, help="Number of worker processes evaluating the surface grids"
+    )
+    parser.add_argument(
+        "--store_dir", type=str, default=None, help="Directory to also write every sweep to as a result store"
+    )
     args = parser.parse_args()
 
-    # Call the main function with the parsed save directory
-    main(args.save_dir)
+    # Call the main function with the parsed arguments
+    main(
+        args.save_dir,
+        dtype=args.dtype,
+        compact=args.compact,
+        backend=args.backend,
+        reader_study=args.reader_study,
+        economics=args.economics,
+        workers=args.workers,
+        store_dir=args.store_dir,
+    )
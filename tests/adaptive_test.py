@@ -0,0 +1,38 @@
+"""
+Tests for the adaptive sweep sampler in calculations/adaptive.py.
+"""
+
+import sys
+import os
+
+import numpy as np
+import pytest
+
+# Add the parent directory to the path to allow imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from calculations.adaptive import adaptive_sample
+from calculations.results import OUTPUT_KEYS, compute_results
+
+
+@pytest.mark.parametrize(
+    "changing_param,start,end",
+    [("sensitivity_ai", 0, 1), ("specificity_ai", 0, 1), ("sensitivity_abbr", 0.6, 1), ("prevalence", 0, 0.2)],
+)
+def test_adaptive_sample_reaches_tolerance(changing_param, start, end, performance_params):
+    """Linear interpolation between the adaptive points stays within tolerance of a dense sweep."""
+    data = adaptive_sample(changing_param, start, end, performance_params, tolerance=1e-3, max_points=100)
+    x = data[changing_param]
+    assert x[0] == start and x[-1] == end and np.all(np.diff(x) > 0)
+
+    dense = compute_results(changing_param, np.linspace(start, end, 100001), performance_params)
+    for key in OUTPUT_KEYS:
+        scale = np.max(np.abs(dense[key])) or 1.0
+        error = np.max(np.abs(np.interp(dense[changing_param], x, data[key]) - dense[key])) / scale
+        assert error < 1e-3, key
+
+
+def test_adaptive_sample_uses_few_points_on_linear_sweeps(performance_params):
+    """Sweeps without kinks or crossings stop after checking the midpoints of the initial grid."""
+    data = adaptive_sample("sensitivity_full", 0, 1, performance_params, max_points=100, initial_points=9)
+    assert data["sensitivity_full"].size == 17
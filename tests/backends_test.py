@@ -0,0 +1,60 @@
+"""
+Parity tests for the backends in calculations/backends.py against process_parameter_set.
+"""
+
+import sys
+import os
+
+import numpy as np
+import pytest
+
+# Add the parent directory to the path to allow imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from calculations import backends
+from calculations.backends import get_backend, resolve_backend
+from calculations.process_parameters import process_parameter_set
+from calculations.results import OUTPUT_KEYS
+
+
+def _random_params(performance_params, shape, seed=0):
+    rng = np.random.default_rng(seed)
+    params = dict(performance_params)
+    for name in ("sensitivity_abbr", "specificity_abbr", "sensitivity_ai", "specificity_ai"):
+        params[name] = rng.uniform(0, 1, shape)
+    params["prevalence"] = rng.uniform(0, 0.2, shape)
+    params["abbr_time"] = rng.uniform(120, 600, shape)
+    return params
+
+
+def test_numba_backend_matches_reference(performance_params):
+    """The fused Numba kernel reproduces the NumPy reference on random, broadcast and scalar inputs."""
+    pytest.importorskip("numba")
+    kernel = get_backend("numba")
+    grid = dict(performance_params, sensitivity_ai=np.linspace(0, 1, 50)[np.newaxis, :])
+    grid["specificity_ai"] = np.linspace(0, 1, 40)[:, np.newaxis]
+    random = _random_params(performance_params, (1000,))
+    broadcast = _random_params(performance_params, (7, 11, 13), seed=1)
+    # Axes along different dimensions, with kernel blocks starting in the middle of rows
+    cube = dict(performance_params, prevalence=np.linspace(0.01, 0.1, 3)[:, np.newaxis, np.newaxis])
+    cube["sensitivity_ai"] = np.linspace(0, 1, 70)[:, np.newaxis]
+    cube["specificity_abbr"] = np.linspace(0.5, 1, 90)
+    for params in (random, broadcast, grid, cube, performance_params):
+        expected = process_parameter_set(**params)
+        data = kernel(**params)
+        assert set(data) == set(OUTPUT_KEYS)
+        shape = np.broadcast_shapes(*(np.shape(value) for value in params.values()))
+        for key in OUTPUT_KEYS:
+            assert np.shape(data[key]) == shape
+            values = np.broadcast_to(expected[key], shape)
+            np.testing.assert_allclose(data[key], values, rtol=1e-14, atol=1e-16)
+
+
+def test_missing_numba_falls_back_to_numpy(monkeypatch):
+    """Requesting Numba without it installed uses the NumPy backend, with a warning."""
+    monkeypatch.setattr(backends, "BACKENDS", {"numpy": process_parameter_set})
+    assert resolve_backend("auto") == "numpy"
+    with pytest.warns(UserWarning):
+        assert resolve_backend("numba") == "numpy"
+    with pytest.raises(ValueError):
+        resolve_backend("cuda")
@@ -0,0 +1,97 @@
+"""
+Tests for the reader-study bootstrap in calculations/bootstrap.py and utils/reader_study.py.
+"""
+
+import sys
+import os
+
+import numpy as np
+import pytest
+
+# Add the parent directory to the path to allow imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from calculations.bootstrap import band_interval, bootstrap_reader_study, confidence_interval, statistics_from_counts
+from utils.reader_study import load_reader_study
+
+
+def _synthetic_cases(n_cases=20000, seed=0):
+    """Draw cases where the radiologist and the AI model partly agree."""
+    rng = np.random.default_rng(seed)
+    cancer = rng.random(n_cases) < 0.05
+    ai_positive = np.where(cancer, rng.random(n_cases) < 0.8, rng.random(n_cases) < 0.2)
+    abbr_rate = np.where(cancer, np.where(ai_positive, 0.97, 0.6), np.where(ai_positive, 0.2, 0.05))
+    abbr_positive = rng.random(n_cases) < abbr_rate
+    return {"cancer": cancer, "ai_positive": ai_positive, "abbr_positive": abbr_positive}
+
+
+def test_statistics_match_direct_calculation(performance_params):
+    cases = _synthetic_cases()
+    counts = np.bincount(cases["cancer"] * 4 + cases["ai_positive"] * 2 + cases["abbr_positive"], minlength=8)
+    statistics = statistics_from_counts(counts, performance_params)
+
+    cancer, ai, abbr = cases["cancer"], cases["ai_positive"], cases["abbr_positive"]
+    np.testing.assert_allclose(statistics["sensitivity_ai"], ai[cancer].mean())
+    np.testing.assert_allclose(statistics["specificity_abbr"], (~abbr[~cancer]).mean())
+    np.testing.assert_allclose(statistics["recall_ai_empirical"], (abbr & ~ai).mean())
+    expected_time = 262 * (~ai).mean() + 776 * (ai | abbr).mean()
+    np.testing.assert_allclose(statistics["avg_time_ai_empirical"], expected_time)
+    # The empirical protocol lies between its bounds
+    assert statistics["recall_ai_best_case"] <= statistics["recall_ai_empirical"]
+    assert statistics["recall_ai_empirical"] <= statistics["recall_ai_worst_case"]
+
+
+def test_bootstrap_interval_covers_sample_estimate(performance_params):
+    cases = _synthetic_cases()
+    replicates = bootstrap_reader_study(cases, performance_params, n_replicates=500, seed=1, batch_size=64)
+    assert all(values.shape == (500,) for values in replicates.values())
+
+    counts = np.bincount(cases["cancer"] * 4 + cases["ai_positive"] * 2 + cases["abbr_positive"], minlength=8)
+    estimate = statistics_from_counts(counts, performance_params)
+    intervals = confidence_interval(replicates)
+    for key in ("recall_ai_empirical", "avg_time_ai_empirical", "band_position"):
+        lower, upper = intervals[key]
+        assert lower <= estimate[key] <= upper
+
+    lower, upper = band_interval(replicates)
+    assert 0 <= lower <= upper <= 1
+
+
+def test_bootstrap_is_reproducible_across_batch_sizes(performance_params):
+    cases = _synthetic_cases(n_cases=1000)
+    first = bootstrap_reader_study(cases, performance_params, n_replicates=100, seed=3, batch_size=100)
+    second = bootstrap_reader_study(cases, performance_params, n_replicates=100, seed=3, batch_size=7)
+    np.testing.assert_array_equal(first["band_position"], second["band_position"])
+
+
+def test_load_reader_study(tmp_path):
+    filepath = tmp_path / "reader_study.csv"
+    filepath.write_text("case_id,abbr_positive,cancer,ai_positive\n1,1,0,0\n2,0,1,1\n3,1,1,0\n")
+    cases = load_reader_study(filepath)
+    np.testing.assert_array_equal(cases["cancer"], [False, True, True])
+    np.testing.assert_array_equal(cases["ai_positive"], [False, True, False])
+    np.testing.assert_array_equal(cases["abbr_positive"], [True, False, True])
+
+    filepath.write_text("cancer,ai_positive\n1,0\n")
+    with pytest.raises(ValueError, match="abbr_positive"):
+        load_reader_study(filepath)
+
+    filepath.write_text("cancer,ai_positive,abbr_positive\n1,0,2\n")
+    with pytest.raises(ValueError, match="0 and 1"):
+        load_reader_study(filepath)
+
+    filepath.write_text("cancer,ai_positive,abbr_positive\n")
+    with pytest.raises(ValueError, match="no cases"):
+        load_reader_study(filepath)
+
+
+def test_degenerate_replicates_are_ignored(performance_params):
+    """Replicates where the bounds coincide have no band position and do not affect the interval."""
+    # An AI model that flags every healthy case and no cancer leaves no room between the bounds
+    counts = np.array([[0, 0, 2, 0, 2, 1, 0, 0], [5, 1, 2, 0, 1, 0, 2, 9], [6, 1, 1, 1, 0, 1, 1, 9]])
+    statistics = statistics_from_counts(counts, performance_params)
+    assert np.isnan(statistics["band_position"][0])
+    assert np.isfinite(statistics["band_position"][1:]).all()
+
+    interval = confidence_interval({"band_position": np.array([-np.inf, 0.2, 0.4, np.inf])}, level=0.5)
+    np.testing.assert_allclose(interval["band_position"], (0.25, 0.35))
@@ -0,0 +1,145 @@
+"""
+Tests for the sweep comparison in calculations/compare.py and the compare.py command.
+"""
+
+import sys
+import os
+import json
+
+import numpy as np
+import pytest
+import toml
+
+# Add the parent directory to the path to allow imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from compare import compare
+from calculations.compare import compare_result_sets, config_diff, diff_summary, iter_diff
+from calculations.sweep import collect, iter_param_range
+from utils.result_store import write_result_store
+
+PARAM_RANGE = {"start": 0, "end": 1, "step": 1001}
+
+
+def test_identical_configs_have_no_differences(performance_params):
+    summary = diff_summary(
+        config_diff("specificity_ai", performance_params, performance_params, PARAM_RANGE, chunk_size=64),
+        "specificity_ai",
+    )
+    assert len(summary) == 8
+    for stats in summary.values():
+        assert stats["max"] == 0 and stats["mean"] == 0 and stats["count"] == 1001
+
+
+def test_summary_matches_in_memory_difference(performance_params):
+    params_b = dict(performance_params, prevalence=0.02, full_time=800)
+    summary = diff_summary(
+        config_diff("specificity_ai", performance_params, params_b, PARAM_RANGE, chunk_size=64), "specificity_ai"
+    )
+    data_a = collect(iter_param_range("specificity_ai", PARAM_RANGE, performance_params))
+    data_b = collect(iter_param_range("specificity_ai", PARAM_RANGE, params_b))
+    for key in ("recall_ai_worst_case", "avg_time_ai_best_case", "avg_time_full"):
+        diff = data_b[key] - data_a[key]
+        index = np.argmax(np.abs(diff))
+        assert np.isclose(summary[key]["max"], np.abs(diff).max())
+        assert np.isclose(summary[key]["mean"], np.abs(diff).mean())
+        assert np.isclose(summary[key]["diff"], diff[index])
+        assert summary[key]["location"] == data_a["specificity_ai"][index]
+
+
+def test_differing_grids_are_interpolated(performance_params):
+    """A sweep compared with a finer, narrower sweep of the same bounds only differs by interpolation."""
+    range_b = {"start": 0.25, "end": 0.75, "step": 5001}
+    stream = config_diff("abbr_time", performance_params, performance_params, PARAM_RANGE, range_b, chunk_size=100)
+    diff = collect(stream)
+    np.testing.assert_array_equal(diff["abbr_time"], np.linspace(0, 1, 1001)[250:751])
+    for key, values in diff.items():
+        if key != "abbr_time":
+            np.testing.assert_allclose(values, 0, atol=1e-9)
+
+    # Chunks of different sizes align the same way
+    stream_a = iter_param_range("sensitivity_ai", PARAM_RANGE, performance_params, chunk_size=7)
+    stream_b = iter_param_range("sensitivity_ai", {"start": 0, "end": 1, "step": 101}, performance_params)
+    coarse = collect(iter_diff(stream_a, stream_b, "sensitivity_ai"))
+    assert coarse["sensitivity_ai"].size == 1001
+    assert np.abs(coarse["recall_ai_worst_case"]).max() < 1e-3
+
+
+def test_compare_result_sets(tmp_path, performance_params):
+    params_b = dict(performance_params, abbr_time=300)
+    for name, params, step in (("a", performance_params, 1001), ("b", params_b, 2001)):
+        param_range = {"start": 0, "end": 1, "step": step}
+        stream = iter_param_range("sensitivity_ai", param_range, params, chunk_size=128, dtype="float32", compact=True)
+        write_result_store(stream, tmp_path / name / "sensitivity_ai", "sensitivity_ai")
+
+    summaries = compare_result_sets(tmp_path / "a", tmp_path / "b", chunk_size=100)
+    assert set(summaries) == {"sensitivity_ai"}
+    summary = summaries["sensitivity_ai"]
+    assert "recall_full" not in summary
+    np.testing.assert_allclose(summary["avg_time_abbr"]["max"], 38, rtol=1e-5)
+    np.testing.assert_allclose(summary["recall_abbr"]["max"], 0, atol=1e-7)
+
+
+def test_compare_keys_stores_by_directory(tmp_path, performance_params):
+    """Two stores sweeping the same parameter are reported and drawn separately."""
+    params_b = dict(performance_params, abbr_time=300)
+    ranges = {"low": {"start": 0, "end": 0.5, "step": 101}, "high": {"start": 0.5, "end": 1, "step": 101}}
+    for version, params in (("a", performance_params), ("b", params_b)):
+        for name, param_range in ranges.items():
+            stream = iter_param_range("sensitivity_ai", param_range, params)
+            write_result_store(stream, tmp_path / version / name, "sensitivity_ai")
+
+    save_dir = tmp_path / "comparison"
+    assert compare(save_dir, a=tmp_path / "a", b=tmp_path / "b")
+    with open(save_dir / "comparison.json") as file:
+        assert set(json.load(file)) == {"low", "high"}
+    assert {path.stem for path in save_dir.glob("*.png")} == {"sensitivity_ai_diff_low", "sensitivity_ai_diff_high"}
+
+
+def test_adaptive_sweeps_are_compared_adaptively(performance_params):
+    """Adaptive sweeps are sampled adaptively in both versions and aligned by interpolation."""
+    param_range = {"start": 0, "end": 1, "step": 40, "sampling": "adaptive", "tolerance": 1e-3}
+    diff = collect(config_diff("sensitivity_ai", performance_params, performance_params, param_range))
+    assert 9 <= diff["sensitivity_ai"].size <= 40
+    assert not np.allclose(np.diff(diff["sensitivity_ai"]), np.diff(diff["sensitivity_ai"])[0])
+    for key, values in diff.items():
+        if key != "sensitivity_ai":
+            np.testing.assert_array_equal(values, 0)
+
+    params_b = dict(performance_params, abbr_time=300)
+    summary = diff_summary(
+        config_diff("sensitivity_ai", performance_params, params_b, param_range, PARAM_RANGE), "sensitivity_ai"
+    )
+    np.testing.assert_allclose(summary["avg_time_abbr"]["max"], 38)
+
+
+def _write_config(path, table):
+    with open(path, "w") as file:
+        toml.dump(table, file)
+    return path
+
+
+def test_compare_configs_validates_and_names_from_changing_a(tmp_path, performance_params, monkeypatch):
+    """Both configurations are validated, and the diff figures are named from changing_a."""
+    import compare as compare_module
+
+    changing = {
+        "sensitivity_ai": {
+            "parameter_range": {"start": 0, "end": 1, "step": 21},
+            "name": "Model sensitivity",
+            "time_range": {"start": 0, "end": 1},
+            "recall_range": {"start": 0, "end": 0.2},
+        }
+    }
+    changing_a = _write_config(tmp_path / "changing.toml", changing)
+    performance_a = _write_config(tmp_path / "performance_a.toml", performance_params)
+    performance_b = _write_config(tmp_path / "performance_b.toml", dict(performance_params, abbr_time=300))
+
+    names = []
+    monkeypatch.setattr(compare_module, "create_diff_figure", lambda *args, **kwargs: names.append(args[2]["name"]))
+    assert compare(tmp_path / "out", performance_a=performance_a, performance_b=performance_b, changing_a=changing_a)
+    assert names == ["Model sensitivity"]
+
+    invalid = _write_config(tmp_path / "invalid.toml", dict(performance_params, prevalence=1.5))
+    with pytest.raises(ValueError, match="invalid.toml"):
+        compare(performance_a=performance_a, performance_b=invalid, changing_a=changing_a)
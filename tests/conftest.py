@@ -0,0 +1,19 @@
+"""
+Shared fixtures for the tests.
+"""
+
+import os
+
+import pytest
+import toml
+
+PERFORMANCE_PARAMETERS_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "configs", "performance_parameters.toml"
+)
+
+
+@pytest.fixture
+def performance_params():
+    """Fixed performance parameters from configs/performance_parameters.toml, as a fresh dict per test."""
+    with open(PERFORMANCE_PARAMETERS_PATH, "r") as file:
+        return toml.load(file)
@@ -0,0 +1,116 @@
+"""
+Tests for the cost and capacity calculations in calculations/economics.py.
+"""
+
+import sys
+import os
+
+import numpy as np
+import pytest
+
+# Add the parent directory to the path to allow imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from calculations.economics import PROTOCOLS, break_even, economics, load_sites, site_summary
+from calculations.grid import evaluate_grid
+from calculations.process_parameters import process_parameter_set
+from calculations.results import compute_results, expand_results
+from utils.site_table import write_site_table
+from figures.create_figures import create_figure
+
+ECONOMICS_PARAMS = {
+    "defaults": {
+        "scanner_cost_per_hour": 500,
+        "radiologist_cost_per_hour": 150,
+        "reading_time_full": 300,
+        "reading_time_abbr": 180,
+        "recall_cost": 200,
+        "annual_volume": 5000,
+    },
+    "sites": {"large": {"annual_volume": 12000}, "cheap": {"scanner_cost_per_hour": 300}},
+}
+
+
+def _sweep(changing_param, values, performance_params):
+    data = compute_results(changing_param, values, performance_params, compact=True)
+    return expand_results(data, changing_param, performance_params)
+
+
+def test_economics_matches_single_point(performance_params):
+    names, sites = load_sites(ECONOMICS_PARAMS)
+    values = np.linspace(0, 1, 11)
+    data = _sweep("specificity_ai", values, performance_params)
+    costs = economics(data, performance_params, sites, changing_param="specificity_ai")
+    assert all(output.shape == (len(names), values.size) for output in costs.values())
+
+    # Price one site at one sweep point by hand
+    params = dict(performance_params, specificity_ai=values[3])
+    point = process_parameter_set(**params)
+    ai_negative = params["prevalence"] * 0.2 + (1 - params["prevalence"]) * values[3]
+    full_fraction = 1 - ai_negative + point["recall_ai_worst_case"]
+    expected = (
+        500 / 3600 * point["avg_time_ai_worst_case"]
+        + 150 / 3600 * (180 * ai_negative + 300 * full_fraction)
+        + 200 * point["recall_ai_worst_case"]
+    )
+    np.testing.assert_allclose(costs["cost_per_screen_ai_worst_case"][0, 3], expected)
+    np.testing.assert_allclose(costs["annual_cost_ai_worst_case"][0, 3], expected * 12000)
+    np.testing.assert_allclose(
+        costs["scanner_hours_saved_abbr"][1, 3], (776 - point["avg_time_abbr"]) / 3600 * 5000
+    )
+
+
+def test_economics_on_grid(performance_params):
+    x_values = np.linspace(0.5, 1, 7)
+    y_values = np.linspace(0.5, 1, 5)
+    grid = evaluate_grid("sensitivity_ai", x_values, "specificity_ai", y_values, performance_params)
+    params = dict(performance_params, sensitivity_ai=x_values[np.newaxis, :], specificity_ai=y_values[:, np.newaxis])
+    costs = economics(grid, params, ECONOMICS_PARAMS["defaults"])
+    for protocol in PROTOCOLS:
+        assert costs[f"cost_per_screen_{protocol}"].shape == (5, 7)
+    np.testing.assert_allclose(costs["scanner_hours_saved_full"], 0)
+
+
+def test_break_even_and_site_summary(tmp_path, performance_params):
+    names, sites = load_sites(ECONOMICS_PARAMS)
+    values = np.linspace(0, 1, 201)
+    data = _sweep("specificity_ai", values, performance_params)
+    summary = site_summary(names, sites, data, "specificity_ai", performance_params)
+
+    # At the break-even specificity the adaptive protocol costs as much as the abbreviated protocol
+    for index in range(len(names)):
+        site = {key: value[index] for key, value in sites.items()}
+        value = summary["break_even_ai_worst_case"][index]
+        params = dict(performance_params, specificity_ai=value)
+        costs = economics(process_parameter_set(**params), params, site)
+        np.testing.assert_allclose(costs["cost_per_screen_ai_worst_case"], costs["cost_per_screen_abbr"], rtol=1e-3)
+
+    # Costs that never cross have no break-even value
+    costs = {"a": np.array([[1.0, 2.0], [3.0, 0.0]]), "b": np.array([0.5, 1.0])}
+    np.testing.assert_array_equal(break_even([0, 1], costs, key="a", reference="b"), [np.nan, 2.5 / 3.5])
+
+    path = write_site_table(tmp_path / "economics.csv", names, summary)
+    lines = path.read_text().splitlines()
+    assert lines[0].startswith("site,scanner_cost_per_hour")
+    assert [line.split(",")[0] for line in lines[1:]] == names
+
+
+def test_load_sites_validation():
+    names, sites = load_sites({"defaults": ECONOMICS_PARAMS["defaults"]})
+    assert names == ["default"]
+    with pytest.raises(ValueError, match="Unknown"):
+        load_sites({"defaults": ECONOMICS_PARAMS["defaults"], "sites": {"typo": {"anual_volume": 1}}})
+    with pytest.raises(ValueError, match="recall_cost"):
+        defaults = dict(ECONOMICS_PARAMS["defaults"])
+        del defaults["recall_cost"]
+        load_sites({"defaults": defaults})
+
+
+def test_time_sweep_is_priced_unchanged_by_its_figures(tmp_path, performance_params):
+    """The results returned by create_figure are priced as calculated, not as normalized for plotting."""
+    param_dict = {"name": "Duration Full Protocol", "parameter_range": {"start": 500, "end": 1200, "step": 8}}
+    data = create_figure("full_time", param_dict, tmp_path)
+    np.testing.assert_allclose(data["avg_time_full"], np.linspace(500, 1200, 8))
+    names, sites = load_sites(ECONOMICS_PARAMS)
+    costs = economics(data, performance_params, sites, changing_param="full_time")
+    np.testing.assert_allclose(costs["scanner_hours_saved_full"], 0, atol=1e-9)
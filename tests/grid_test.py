@@ -0,0 +1,40 @@
+"""
+Tests for the 2-D grid evaluation in calculations/grid.py.
+"""
+
+import sys
+import os
+
+import numpy as np
+import pytest
+
+# Add the parent directory to the path to allow imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from calculations import grid
+from calculations.grid import evaluate_grid, evaluate_surface, surface_outputs
+
+
+@pytest.mark.parametrize("reduce", ["mean", "min", "max"])
+def test_surface_matches_block_aggregated_grid(monkeypatch, reduce, performance_params):
+    """Aggregating block by block gives the same surface as aggregating the full grid."""
+    # Force several row blocks on a small grid
+    monkeypatch.setattr(grid, "CHUNK_SIZE", 1000)
+    x = np.linspace(0, 1, 120)
+    y = np.linspace(0.6, 1, 90)
+    surface = evaluate_surface("sensitivity_ai", x, "specificity_abbr", y, performance_params, (30, 40), reduce)
+    full = surface_outputs(evaluate_grid("sensitivity_ai", x, "specificity_abbr", y, performance_params))
+    for key, values in full.items():
+        expected = getattr(values.reshape(30, 3, 40, 3), reduce)(axis=(1, 3))
+        np.testing.assert_allclose(surface[key], expected, rtol=1e-12, atol=1e-12)
+    np.testing.assert_allclose(surface["sensitivity_ai"], x.reshape(40, 3).mean(axis=1))
+
+
+def test_surface_without_aggregation_is_exact(performance_params):
+    """Grids smaller than the resolution are returned point for point."""
+    x = np.linspace(0, 1, 50)
+    y = np.linspace(0, 1, 20)
+    surface = evaluate_surface("sensitivity_ai", x, "specificity_ai", y, performance_params, resolution=100)
+    full = surface_outputs(evaluate_grid("sensitivity_ai", x, "specificity_ai", y, performance_params))
+    for key, values in full.items():
+        np.testing.assert_array_equal(surface[key], values)
@@ -71,5 +71,30 @@ def test_main_execution():
             pytest.fail(f"Main function execution failed with error: {str(e)}")
 
 
+def test_main_writes_result_stores(tmp_path):
+    """With store_dir, every sweep is written to a complete result store named after its parameter."""
+    from utils.result_store import open_result_store
+
+    main(save_dir=tmp_path / "figures", compact=True, store_dir=tmp_path / "stores")
+    stores = sorted((tmp_path / "stores").iterdir())
+    assert stores
+    for store in stores:
+        data, info = open_result_store(store)
+        assert info["changing_param"] == store.name
+        assert data[store.name].size == info["length"] > 0
+
+
+
+def test_main_rejects_economics_without_economics_parameters(tmp_path, monkeypatch):
+    """Requesting economics figures from a plan compiled without economics_parameters.toml fails before any work."""
+    import main as main_module
+    from utils.plan import compile_plan
+
+    monkeypatch.setattr(main_module, "compile_plan", lambda: compile_plan(economics_path=None))
+    with pytest.raises(ValueError, match="economics_parameters.toml"):
+        main(save_dir=tmp_path / "figures", economics=True)
+    assert not (tmp_path / "figures").exists()
+
+
 if __name__ == "__main__":
     pytest.main()
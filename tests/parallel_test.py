@@ -0,0 +1,77 @@
+"""
+Tests for the shared-memory grid executor in calculations/parallel.py and its use by evaluate_surface.
+"""
+
+import sys
+import os
+import multiprocessing
+
+import numpy as np
+import pytest
+
+# Add the parent directory to the path to allow imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from calculations import grid, parallel
+from calculations.grid import evaluate_grid, evaluate_surface
+from calculations.parallel import evaluate_grid_parallel
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+@pytest.mark.parametrize("dtype", ["float64", "float32"])
+def test_parallel_grid_is_bit_identical_to_serial(workers, dtype, performance_params):
+    """Every chunk size and worker count gives exactly the serial results."""
+    x = np.linspace(0, 1, 301)
+    y = np.linspace(0.6, 1, 199)
+    expected = evaluate_grid("sensitivity_ai", x, "specificity_abbr", y, performance_params, dtype=dtype)
+    data = evaluate_grid_parallel(
+        {"specificity_abbr": y, "sensitivity_ai": x}, performance_params, workers=workers, chunk_size=7919, dtype=dtype
+    )
+    for key, values in expected.items():
+        assert data[key].dtype == np.dtype(dtype)
+        np.testing.assert_array_equal(data[key], values)
+
+
+def test_parallel_surface_is_bit_identical_to_serial(monkeypatch, performance_params):
+    """Surface blocks handed out to one pool aggregate to exactly the serial surface."""
+    # Force several row blocks
+    monkeypatch.setattr(grid, "CHUNK_SIZE", 60 * 150)
+    x = np.linspace(0, 1, 150)
+    y = np.linspace(0.6, 1, 100)
+    args = ("sensitivity_ai", x, "specificity_abbr", y, performance_params, (50, 50))
+    expected = evaluate_surface(*args)
+
+    # Count the pools, shared outputs and tasks of the parallel surface
+    counts = {"pools": 0, "shared": 0, "tasks": 0}
+    get_context, shared_memory, map_shared = (
+        multiprocessing.get_context,
+        parallel.shared_memory.SharedMemory,
+        grid.map_shared,
+    )
+
+    def counting_context(method):
+        context = get_context(method)
+
+        class CountingContext:
+            def Pool(self, *pool_args, **kwargs):
+                counts["pools"] += 1
+                return context.Pool(*pool_args, **kwargs)
+
+        return CountingContext()
+
+    def counting_shared_memory(*shm_args, **kwargs):
+        counts["shared"] += 1
+        return shared_memory(*shm_args, **kwargs)
+
+    def counting_map_shared(function, bounds, *map_args):
+        counts["tasks"] += len(bounds)
+        return map_shared(function, bounds, *map_args)
+
+    monkeypatch.setattr(parallel.multiprocessing, "get_context", counting_context)
+    monkeypatch.setattr(parallel.shared_memory, "SharedMemory", counting_shared_memory)
+    monkeypatch.setattr(grid, "map_shared", counting_map_shared)
+    surface = evaluate_surface(*args, workers=2)
+    for key, values in expected.items():
+        np.testing.assert_array_equal(surface[key], values)
+    assert counts["pools"] == 1 and counts["shared"] == 1
+    assert counts["tasks"] >= grid.TASKS_PER_WORKER * 2
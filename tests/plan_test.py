@@ -0,0 +1,127 @@
+"""
+Tests for the configuration validation and the compiled plan in utils/plan.py.
+"""
+
+import sys
+import os
+import copy
+import dataclasses
+import pickle
+
+import pytest
+
+# Add the parent directory to the path to allow imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.parameter_loader import load_parameters
+from utils.plan import compile_parameters, compile_plan, load_plan, save_plan, validate_parameters
+
+CONFIG_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "configs")
+
+
+def _load_configs():
+    names = (
+        "performance_parameters",
+        "changing_parameters",
+        "plot_parameters",
+        "surface_parameters",
+        "economics_parameters",
+    )
+    return [load_parameters(os.path.join(CONFIG_DIR, f"{name}.toml")) for name in names]
+
+
+def test_repository_configs_compile():
+    paths = [
+        os.path.join(CONFIG_DIR, f"{name}.toml")
+        for name in (
+            "performance_parameters",
+            "changing_parameters",
+            "plot_parameters",
+            "surface_parameters",
+            "economics_parameters",
+        )
+    ]
+    performance_params, changing_params, plot_params, _, economics_params = _load_configs()
+    plan = compile_plan(*paths)
+    assert plan.performance_params == performance_params
+    assert plan.plot_params == plot_params
+    assert plan.economics_params == economics_params
+    assert [job.changing_param for job in plan.sweeps] == list(changing_params)
+    jobs = {job.changing_param: job for job in plan.sweeps}
+    assert jobs["full_time"].figures == ("time_diff",)
+    assert jobs["sensitivity_ai"].figures == ("recall", "time")
+    assert jobs["sensitivity_ai"].values().size == changing_params["sensitivity_ai"]["parameter_range"]["step"]
+
+
+def test_invalid_configs_report_every_problem():
+    performance_params, changing_params, plot_params, surface_params, _ = _load_configs()
+    performance_params["sensitivity_aii"] = 0.5
+    del performance_params["prevalence"]
+    changing_params = copy.deepcopy(changing_params)
+    del changing_params["sensitivity_ai"]["parameter_range"]["end"]
+    changing_params["specificity_ai"]["parameter_range"]["step"] = 2
+    changing_params["specificty_abbr"] = changing_params.pop("specificity_abbr")
+    changing_params["abbr_time"]["parameter_range"]["start"] = -10
+    changing_params["sensitivity_full"] = copy.deepcopy(changing_params["sensitivity_ai"])
+    plot_params["format"] = ["png", "bmpx"]
+    surface_params["ai_performance"]["y"] = "unknown"
+
+    errors = validate_parameters(performance_params, changing_params, plot_params, surface_params)
+    expected = [
+        "performance_parameters: unknown key 'sensitivity_aii', did you mean 'sensitivity_ai'?",
+        "performance_parameters: missing key 'prevalence'",
+        "changing_parameters.sensitivity_ai.parameter_range: missing key 'end'",
+        "changing_parameters.specificity_ai.parameter_range.step: expected an integer of at least 3, got 2",
+        "changing_parameters.specificty_abbr: unknown parameter 'specificty_abbr', did you mean 'specificity_abbr'?",
+        "changing_parameters.abbr_time.parameter_range.start: expected a positive number, got -10",
+        "changing_parameters.sensitivity_full: the bounds do not depend on 'sensitivity_full', so it cannot be swept",
+        "surface_parameters.ai_performance.y: 'unknown' is not in changing_parameters",
+    ]
+    for message in expected:
+        assert message in errors
+    assert any(error.startswith("plot_parameters.format: expected a format") for error in errors)
+    assert len(errors) == len(expected) + 1
+
+    with pytest.raises(ValueError, match="Invalid configuration"):
+        compile_parameters(performance_params, changing_params, plot_params, surface_params)
+
+
+def test_invalid_economics_is_reported():
+    performance_params, changing_params, plot_params, surface_params, economics_params = _load_configs()
+    economics_params["changing_params"].append("sensitivity_aii")
+    economics_params["sites"]["academic"]["scanner_cost_per_hr"] = 650
+    del economics_params["defaults"]["recall_cost"]
+    economics_params["sites"]["community"]["recall_cost"] = -1
+
+    errors = validate_parameters(performance_params, changing_params, plot_params, surface_params, economics_params)
+    assert errors == [
+        "economics_parameters.changing_params: 'sensitivity_aii' is not in changing_parameters",
+        "economics_parameters.sites.academic: unknown key 'scanner_cost_per_hr', did you mean 'scanner_cost_per_hour'?",
+        "economics_parameters.sites.community.recall_cost: expected a number of at least 0, got -1",
+    ]
+
+    economics_params["sites"]["academic"].pop("scanner_cost_per_hr")
+    economics_params["sites"]["community"]["recall_cost"] = 150
+    errors = validate_parameters(performance_params, changing_params, plot_params, surface_params, economics_params)
+    assert errors[1:] == [
+        "economics_parameters.sites.academic: missing key 'recall_cost', which is not in defaults either"
+    ]
+
+
+def test_plan_is_immutable_and_serializable(tmp_path):
+    plan = compile_parameters(*_load_configs())
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        plan.sweeps = ()
+    with pytest.raises(TypeError):
+        plan.fixed["prevalence"] = 0.5
+    with pytest.raises(TypeError):
+        plan.plot["colors"]["ai"] = "black"
+
+    # Properties are copies, changing them does not change the plan
+    performance_params = plan.performance_params
+    performance_params["prevalence"] = 0.5
+    assert plan.performance_params["prevalence"] != 0.5
+
+    assert pickle.loads(pickle.dumps(plan)) == plan
+    save_plan(plan, tmp_path / "plan.json")
+    assert load_plan(tmp_path / "plan.json") == plan
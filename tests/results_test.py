@@ -0,0 +1,66 @@
+"""
+Tests for the compact result representation in calculations/results.py.
+
+The float64 path must reproduce the scalar process_parameter_set exactly, and the reduced
+dtypes must stay within the documented relative error of the float64 path.
+"""
+
+import sys
+import os
+
+import numpy as np
+import pytest
+
+# Add the parent directory to the path to allow imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from calculations.process_parameters import process_parameter_set
+from calculations.results import OUTPUT_KEYS, compute_results, expand_results, max_relative_error
+
+SWEEPS = [
+    ("sensitivity_ai", 0, 1),
+    ("specificity_abbr", 0.6, 1),
+    ("abbr_time", 120, 600),
+    ("full_time", 500, 1200),
+]
+
+
+def _scalar_reference(changing_param, values, performance_params):
+    reference = {key: [] for key in OUTPUT_KEYS}
+    for value in values:
+        new_data = process_parameter_set(**{**performance_params, changing_param: float(value)})
+        for key in OUTPUT_KEYS:
+            reference[key].append(new_data[key])
+    return reference
+
+
+@pytest.mark.parametrize("changing_param,start,end", SWEEPS)
+def test_float64_matches_scalar_path(changing_param, start, end, performance_params):
+    """The vectorized float64 results are identical to evaluating every step separately."""
+    values = np.linspace(start, end, 100)
+    reference = _scalar_reference(changing_param, values, performance_params)
+    data = expand_results(
+        compute_results(changing_param, values, performance_params, compact=True), changing_param, performance_params
+    )
+    for key in OUTPUT_KEYS:
+        np.testing.assert_array_equal(data[key], np.asarray(reference[key], dtype=np.float64))
+
+
+@pytest.mark.parametrize("changing_param,start,end", SWEEPS)
+@pytest.mark.parametrize("dtype,tolerance", [("float32", 1e-7), ("float16", 1e-3)])
+def test_reduced_dtype_accuracy(changing_param, start, end, dtype, tolerance, performance_params):
+    """Reduced dtypes stay within the documented relative error of the float64 path."""
+    values = np.linspace(start, end, 100)
+    reference = compute_results(changing_param, values, performance_params)
+    data = compute_results(changing_param, values, performance_params, dtype=dtype)
+    assert all(data[key].dtype == np.dtype(dtype) for key in OUTPUT_KEYS)
+    assert max(max_relative_error(data, reference).values()) < tolerance
+
+
+def test_compact_drops_derived_outputs(performance_params):
+    """Compact mode stores neither recall_full nor avg_time_full."""
+    values = np.linspace(0, 1, 10)
+    data = compute_results("sensitivity_ai", values, performance_params, compact=True)
+    assert "recall_full" not in data and "avg_time_full" not in data
+    expanded = expand_results(data, "sensitivity_ai", performance_params)
+    assert expanded["avg_time_full"].strides == (0,)
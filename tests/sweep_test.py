@@ -0,0 +1,78 @@
+"""
+Tests for the streaming sweep API in calculations/sweep.py and the result store in utils/result_store.py.
+"""
+
+import sys
+import os
+import tempfile
+
+import numpy as np
+import pytest
+
+# Add the parent directory to the path to allow imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from calculations.results import compute_results
+from calculations.sweep import collect, decimate, iter_param_range, iter_sweep, linspace_chunks, until_crossing
+from utils.result_store import iter_result_store, open_result_store, store_chunks
+
+
+def test_streamed_sweep_matches_full_sweep(performance_params):
+    """Collecting a chunked sweep gives the same result as calculating it at once."""
+    param_range = {"start": 120, "end": 600, "step": 1001}
+    values = np.concatenate(list(linspace_chunks(120, 600, 1001, 64)))
+    np.testing.assert_array_equal(values, np.linspace(120, 600, 1001))
+    expected = compute_results("abbr_time", np.linspace(120, 600, 1001), performance_params)
+    data = collect(iter_param_range("abbr_time", param_range, performance_params, chunk_size=64))
+    for key, values in expected.items():
+        np.testing.assert_array_equal(data[key], values)
+    decimated = collect(decimate(iter_sweep("abbr_time", expected["abbr_time"], performance_params, 64), 7))
+    np.testing.assert_array_equal(decimated["abbr_time"], expected["abbr_time"][::7])
+
+
+def test_until_crossing_stops_early(performance_params):
+    """The sweep stops at the first step past the target, without calculating later chunks."""
+    calculated = []
+
+    def chunks():
+        for chunk in linspace_chunks(0, 1, 1000, 100):
+            calculated.append(chunk)
+            yield chunk
+
+    stream = iter_sweep("specificity_ai", chunks(), performance_params)
+    data = collect(until_crossing(stream, "avg_time_ai_worst_case", 400))
+    assert data["avg_time_ai_worst_case"][-1] <= 400 < data["avg_time_ai_worst_case"][-2]
+    assert len(calculated) < 10
+
+
+def test_until_crossing_starts_on_target():
+    """A sweep starting at the target takes its side from the first step away from it."""
+    chunks = (np.array([0.0, 0.0]), np.array([0.0, 1.0, 2.0]), np.array([1.0, -1.0, -2.0]))
+    stream = ({"x": values} for values in chunks)
+    data = collect(until_crossing(stream, "x", 0))
+    np.testing.assert_array_equal(data["x"], [0, 0, 0, 1, 2, 1, -1])
+
+
+def test_result_store_round_trip(performance_params):
+    """Stored chunks are read back unchanged, also when the store is read in other chunk sizes."""
+    values = np.linspace(0, 1, 500)
+    with tempfile.TemporaryDirectory() as store_dir:
+        stream = iter_sweep("sensitivity_ai", values, performance_params, chunk_size=64, dtype="float32")
+        written = collect(store_chunks(stream, store_dir, "sensitivity_ai", metadata=performance_params))
+        data, info = open_result_store(store_dir)
+        assert info["changing_param"] == "sensitivity_ai" and info["length"] == 500
+        read = collect(iter_result_store(store_dir, chunk_size=99))
+        for key, values in written.items():
+            np.testing.assert_array_equal(read[key], values)
+            assert data[key].dtype == values.dtype
+
+
+def test_interrupted_store_is_rejected(performance_params):
+    """A store whose sweep was not consumed to the end cannot be opened."""
+    values = np.linspace(0, 1, 500)
+    with tempfile.TemporaryDirectory() as store_dir:
+        stream = store_chunks(iter_sweep("sensitivity_ai", values, performance_params, 64), store_dir, "sensitivity_ai")
+        next(stream)
+        stream.close()
+        with pytest.raises(ValueError, match="incomplete"):
+            open_result_store(store_dir)
@@ -10,3 +10,5 @@ CONFIG_DIR = PROJECT_ROOT / "configs"
 CHANGING_PARAMETERS_PATH = CONFIG_DIR / "changing_parameters.toml"
 PERFORMANCE_PARAMETERS_PATH = CONFIG_DIR / "performance_parameters.toml"
 PLOT_PARAMETERS_PATH = CONFIG_DIR / "plot_parameters.toml"
+SURFACE_PARAMETERS_PATH = CONFIG_DIR / "surface_parameters.toml"
+ECONOMICS_PARAMETERS_PATH = CONFIG_DIR / "economics_parameters.toml"
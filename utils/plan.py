@@ -0,0 +1,519 @@
+"""Validate the TOML configuration once and compile it into an immutable execution plan."""
+
+import difflib
+import json
+import numpy as np
+from dataclasses import dataclass
+from types import MappingProxyType
+from matplotlib.backend_bases import FigureCanvasBase
+from calculations.backends import KERNEL_INPUTS
+from calculations.economics import SITE_KEYS
+from utils.parameter_loader import load_parameters
+from utils.paths import (
+    CHANGING_PARAMETERS_PATH,
+    ECONOMICS_PARAMETERS_PATH,
+    PERFORMANCE_PARAMETERS_PATH,
+    PLOT_PARAMETERS_PATH,
+    SURFACE_PARAMETERS_PATH,
+)
+
+
+# Minimum number of steps of a sweep or surface axis; two points cannot show a kink of the bounds
+MIN_STEP = 3
+
+# Sampling modes of a parameter_range
+SAMPLINGS = ("linspace", "adaptive")
+
+# Parameters given in seconds, whose sweeps compare protocol durations rather than recall rates and times
+TIME_PARAMETERS = ("full_time", "abbr_time")
+
+# Performance parameters the bounds depend on; sweeping any other one would only repeat flat lines
+SWEEP_PARAMETERS = KERNEL_INPUTS
+
+# Schemas map every key to a check in _CHECKS, or to the schema of a nested table.
+# Keys ending in '?' are optional.
+PERFORMANCE_SCHEMA = {
+    "sensitivity_full": "fraction",
+    "specificity_full": "fraction",
+    "sensitivity_abbr": "fraction",
+    "specificity_abbr": "fraction",
+    "sensitivity_ai": "fraction",
+    "specificity_ai": "fraction",
+    "prevalence": "fraction",
+    "full_time": "positive",
+    "abbr_time": "positive",
+}
+
+_RANGE_SCHEMA = {"start": "number", "end": "number"}
+
+CHANGING_SCHEMA = {
+    "parameter_range": {
+        "start": "number",
+        "end": "number",
+        "step": "step",
+        "sampling?": "sampling",
+        "tolerance?": "positive",
+    },
+    "name": "string",
+    "time_range?": _RANGE_SCHEMA,
+    "recall_range?": _RANGE_SCHEMA,
+}
+
+PLOT_SCHEMA = {
+    "title_size": "positive",
+    "label_size": "positive",
+    "tick_size": "positive",
+    "legend_size": "positive",
+    "linewidth": "positive",
+    "false_zero": "number",
+    "recall_ylim": "positive",
+    "time_ylim": "positive",
+    "band": "band",
+    "format": "formats",
+    "dpi": "dpi",
+    "rasterize_bands": "boolean",
+    "save_workers": "count",
+    "colors": {"full": "string", "abbr": "string", "ai": "string", "ai_alpha": "fraction"},
+    "surface": {"cmap": "string", "diverging_cmap": "string", "resolution": "count"},
+    "diff": {"points": "count"},
+}
+
+SURFACE_SCHEMA = {"x": "string", "y": "string", "step": "step"}
+
+# Defaults and sites may each leave out site parameters, as long as every site ends up with all of them
+SITE_SCHEMA = {f"{key}?": "nonnegative" for key in SITE_KEYS}
+
+ECONOMICS_SCHEMA = {"changing_params": "strings", "defaults": SITE_SCHEMA, "sites?": "tables"}
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _is_count(value, minimum=1):
+    return isinstance(value, int) and not isinstance(value, bool) and value >= minimum
+
+
+def _as_list(value):
+    return [value] if isinstance(value, (str, int, float)) else value
+
+
+_CHECKS = {
+    "number": (_is_number, "a number"),
+    "positive": (lambda value: _is_number(value) and value > 0, "a positive number"),
+    "nonnegative": (lambda value: _is_number(value) and value >= 0, "a number of at least 0"),
+    "fraction": (lambda value: _is_number(value) and 0 <= value <= 1, "a number between 0 and 1"),
+    "count": (_is_count, "a positive integer"),
+    "step": (lambda value: _is_count(value, MIN_STEP), f"an integer of at least {MIN_STEP}"),
+    "string": (lambda value: isinstance(value, str), "a string"),
+    "strings": (
+        lambda value: isinstance(value, list) and all(isinstance(item, str) for item in value),
+        "a list of strings",
+    ),
+    "tables": (
+        lambda value: isinstance(value, dict) and all(isinstance(item, dict) for item in value.values()),
+        "a table of tables",
+    ),
+    "boolean": (lambda value: isinstance(value, bool), "true or false"),
+    "sampling": (lambda value: value in SAMPLINGS, f"one of {list(SAMPLINGS)}"),
+    "band": (
+        lambda value: isinstance(value, list)
+        and len(value) == 2
+        and all(_is_number(bound) and 0 <= bound <= 1 for bound in value)
+        and value[0] <= value[1],
+        "a list of two increasing numbers between 0 and 1",
+    ),
+    "formats": (
+        lambda value: isinstance(_as_list(value), list)
+        and len(_as_list(value)) > 0
+        and all(fmt in FigureCanvasBase.get_supported_filetypes() for fmt in _as_list(value)),
+        f"a format or list of formats from {sorted(FigureCanvasBase.get_supported_filetypes())}",
+    ),
+    "dpi": (
+        lambda value: isinstance(_as_list(value), list)
+        and len(_as_list(value)) > 0
+        and all(_is_number(dpi) and dpi > 0 for dpi in _as_list(value)),
+        "a positive number or list of positive numbers",
+    ),
+}
+
+
+def _validate(table, schema, location, errors):
+    """Append a message to errors for every missing, unknown or invalid key of table."""
+    if not isinstance(table, dict):
+        errors.append(f"{location}: expected a table")
+        return
+    names = {key.rstrip("?"): key for key in schema}
+    for key in table:
+        if key not in names:
+            close = difflib.get_close_matches(key, names, n=1)
+            errors.append(f"{location}: unknown key '{key}'" + (f", did you mean '{close[0]}'?" if close else ""))
+    for name, key in names.items():
+        if name not in table:
+            if not key.endswith("?"):
+                errors.append(f"{location}: missing key '{name}'")
+            continue
+        if isinstance(schema[key], dict):
+            _validate(table[name], schema[key], f"{location}.{name}", errors)
+            continue
+        check, description = _CHECKS[schema[key]]
+        if not check(table[name]):
+            errors.append(f"{location}.{name}: expected {description}, got {table[name]!r}")
+
+
+def validate_parameters(performance_params, changing_params, plot_params, surface_params=None, economics_params=None):
+    """
+    Check loaded configuration tables against the schemas.
+
+    Parameters
+    ----------
+    performance_params : dict
+        Parameters loaded from performance_parameters.toml
+    changing_params : dict
+        Parameters loaded from changing_parameters.toml
+    plot_params : dict
+        Parameters loaded from plot_parameters.toml
+    surface_params : dict, optional
+        Parameters loaded from surface_parameters.toml, by default no surfaces
+    economics_params : dict, optional
+        Parameters loaded from economics_parameters.toml, by default no economics
+
+    Returns
+    -------
+    list of str
+        One message per problem found, empty if the configuration is valid
+    """
+    errors = []
+    _validate(performance_params, PERFORMANCE_SCHEMA, "performance_parameters", errors)
+    _validate(plot_params, PLOT_SCHEMA, "plot_parameters", errors)
+
+    for changing_param, param_dict in changing_params.items():
+        location = f"changing_parameters.{changing_param}"
+        if changing_param not in PERFORMANCE_SCHEMA:
+            close = difflib.get_close_matches(changing_param, PERFORMANCE_SCHEMA, n=1)
+            hint = f", did you mean '{close[0]}'?" if close else ""
+            errors.append(f"{location}: unknown parameter '{changing_param}'{hint}")
+            continue
+        if changing_param not in SWEEP_PARAMETERS:
+            errors.append(f"{location}: the bounds do not depend on '{changing_param}', so it cannot be swept")
+            continue
+        count = len(errors)
+        _validate(param_dict, CHANGING_SCHEMA, location, errors)
+        if len(errors) > count:
+            continue
+        # The range must lie within the valid values of the parameter and increase
+        param_range = param_dict["parameter_range"]
+        check, description = _CHECKS[PERFORMANCE_SCHEMA[changing_param]]
+        for bound in ("start", "end"):
+            if not check(param_range[bound]):
+                errors.append(f"{location}.parameter_range.{bound}: expected {description}, got {param_range[bound]!r}")
+        if param_range["start"] >= param_range["end"]:
+            errors.append(f"{location}.parameter_range: start must be smaller than end")
+
+    for surface_name, surface_dict in (surface_params or {}).items():
+        location = f"surface_parameters.{surface_name}"
+        count = len(errors)
+        _validate(surface_dict, SURFACE_SCHEMA, location, errors)
+        if len(errors) > count:
+            continue
+        for axis in ("x", "y"):
+            if surface_dict[axis] not in changing_params:
+                errors.append(f"{location}.{axis}: '{surface_dict[axis]}' is not in changing_parameters")
+        if surface_dict["x"] == surface_dict["y"]:
+            errors.append(f"{location}: x and y must be different parameters")
+
+    if economics_params is not None:
+        _validate_economics(economics_params, changing_params, errors)
+    return errors
+
+
+def _validate_economics(economics_params, changing_params, errors):
+    """Append a message to errors for every problem of economics_parameters.toml, as load_sites would find it."""
+    count = len(errors)
+    _validate(economics_params, ECONOMICS_SCHEMA, "economics_parameters", errors)
+    if len(errors) > count:
+        return
+    for changing_param in economics_params["changing_params"]:
+        if changing_param not in changing_params:
+            errors.append(f"economics_parameters.changing_params: '{changing_param}' is not in changing_parameters")
+    # Without sites, the defaults are priced as a single site
+    defaults = economics_params["defaults"]
+    named = bool(economics_params.get("sites"))
+    sites = economics_params["sites"] if named else {"default": {}}
+    for site_name, site in sites.items():
+        location = f"economics_parameters.sites.{site_name}" if named else "economics_parameters.defaults"
+        count = len(errors)
+        _validate(site, SITE_SCHEMA, location, errors)
+        if len(errors) > count:
+            continue
+        for key in SITE_KEYS:
+            if key not in site and key not in defaults:
+                errors.append(f"{location}: missing key '{key}', which is not in defaults either")
+
+
+def _freeze(value):
+    """Return a read-only copy of nested tables and lists."""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def _thaw(value):
+    """Return a plain, JSON-serializable copy of a frozen value."""
+    if isinstance(value, MappingProxyType):
+        return {key: _thaw(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [_thaw(item) for item in value]
+    return value
+
+
+def sweep_figures(changing_param):
+    """Return the kinds of figures created for a sweep of changing_param."""
+    if changing_param in TIME_PARAMETERS:
+        return ("time_diff",)
+    return ("recall", "time")
+
+
+@dataclass(frozen=True)
+class SweepJob:
+    """One parameter sweep and the figures created from it."""
+
+    changing_param: str
+    name: str
+    start: float
+    end: float
+    step: int
+    sampling: str
+    tolerance: float
+    figures: tuple
+
+    @property
+    def param_dict(self):
+        """Parameter information in the form of a changing_parameters.toml entry."""
+        param_range = {"start": self.start, "end": self.end, "step": self.step, "sampling": self.sampling}
+        param_range["tolerance"] = self.tolerance
+        return {"name": self.name, "parameter_range": param_range}
+
+    def values(self):
+        """Values of the evenly spaced sweep axis."""
+        return np.linspace(self.start, self.end, self.step)
+
+
+@dataclass(frozen=True)
+class SurfaceJob:
+    """One surface figure over the grid spanned by two changing parameters."""
+
+    x: str
+    y: str
+    step: int
+
+    @property
+    def surface_dict(self):
+        """Surface definition in the form of a surface_parameters.toml entry."""
+        return {"x": self.x, "y": self.y, "step": self.step}
+
+
+@dataclass(frozen=True)
+class ScenarioPlan:
+    """
+    Validated configuration of a complete run.
+
+    The plan is read-only: the properties return fresh copies, so workers can use them
+    without affecting each other. It pickles and converts to JSON through to_dict.
+    """
+
+    fixed: MappingProxyType
+    sweeps: tuple
+    surfaces: tuple
+    plot: MappingProxyType
+    economics: MappingProxyType = None
+
+    @property
+    def performance_params(self):
+        """Fixed performance parameters, as loaded from performance_parameters.toml."""
+        return dict(self.fixed)
+
+    @property
+    def plot_params(self):
+        """Plot parameters, as loaded from plot_parameters.toml."""
+        return _thaw(self.plot)
+
+    @property
+    def economics_params(self):
+        """Economics parameters, as loaded from economics_parameters.toml, or None without economics."""
+        return _thaw(self.economics)
+
+    @property
+    def changing_params(self):
+        """Parameter information of every sweep, as loaded from changing_parameters.toml."""
+        return {job.changing_param: job.param_dict for job in self.sweeps}
+
+    def to_dict(self):
+        """Return the plan as plain, JSON-serializable dictionaries and lists."""
+        return {
+            "performance_params": self.performance_params,
+            "sweeps": [dict(vars(job), figures=list(job.figures)) for job in self.sweeps],
+            "surfaces": [dict(vars(job)) for job in self.surfaces],
+            "plot_params": self.plot_params,
+            "economics_params": self.economics_params,
+        }
+
+    def __reduce__(self):
+        return plan_from_dict, (self.to_dict(),)
+
+
+def plan_from_dict(plan_dict):
+    """
+    Restore a plan from the output of ScenarioPlan.to_dict.
+
+    Parameters
+    ----------
+    plan_dict : dict
+        Plan as returned by ScenarioPlan.to_dict, e.g. read back from JSON
+
+    Returns
+    -------
+    ScenarioPlan
+        The restored plan
+    """
+    sweeps = tuple(SweepJob(**dict(job, figures=tuple(job["figures"]))) for job in plan_dict["sweeps"])
+    return ScenarioPlan(
+        fixed=_freeze(plan_dict["performance_params"]),
+        sweeps=sweeps,
+        surfaces=tuple(SurfaceJob(**job) for job in plan_dict["surfaces"]),
+        plot=_freeze(plan_dict["plot_params"]),
+        economics=_freeze(plan_dict.get("economics_params")),
+    )
+
+
+def compile_parameters(performance_params, changing_params, plot_params, surface_params=None, economics_params=None):
+    """
+    Validate loaded configuration tables and compile them into a plan.
+
+    Parameters
+    ----------
+    performance_params : dict
+        Parameters loaded from performance_parameters.toml
+    changing_params : dict
+        Parameters loaded from changing_parameters.toml
+    plot_params : dict
+        Parameters loaded from plot_parameters.toml
+    surface_params : dict, optional
+        Parameters loaded from surface_parameters.toml, by default no surfaces
+    economics_params : dict, optional
+        Parameters loaded from economics_parameters.toml, by default no economics
+
+    Returns
+    -------
+    ScenarioPlan
+        Plan with one SweepJob per changing parameter and one SurfaceJob per surface
+
+    Raises
+    ------
+    ValueError
+        If the configuration is invalid, listing every problem found
+    """
+    errors = validate_parameters(performance_params, changing_params, plot_params, surface_params, economics_params)
+    if errors:
+        raise ValueError("Invalid configuration:\n  " + "\n  ".join(errors))
+
+    sweeps = []
+    for changing_param, param_dict in changing_params.items():
+        param_range = param_dict["parameter_range"]
+        sweeps.append(
+            SweepJob(
+                changing_param=changing_param,
+                name=param_dict["name"],
+                start=float(param_range["start"]),
+                end=float(param_range["end"]),
+                step=param_range["step"],
+                sampling=param_range.get("sampling", "linspace"),
+                tolerance=float(param_range.get("tolerance", 1e-3)),
+                figures=sweep_figures(changing_param),
+            )
+        )
+    surfaces = [SurfaceJob(**surface_dict) for surface_dict in (surface_params or {}).values()]
+    return ScenarioPlan(
+        fixed=_freeze(performance_params),
+        sweeps=tuple(sweeps),
+        surfaces=tuple(surfaces),
+        plot=_freeze(plot_params),
+        economics=_freeze(economics_params),
+    )
+
+
+def compile_plan(
+    performance_path=PERFORMANCE_PARAMETERS_PATH,
+    changing_path=CHANGING_PARAMETERS_PATH,
+    plot_path=PLOT_PARAMETERS_PATH,
+    surface_path=SURFACE_PARAMETERS_PATH,
+    economics_path=ECONOMICS_PARAMETERS_PATH,
+):
+    """
+    Load the TOML configuration files once, validate them and compile them into a plan.
+
+    Parameters
+    ----------
+    performance_path : str or Path, optional
+        Path to performance_parameters.toml, by default the one in configs
+    changing_path : str or Path, optional
+        Path to changing_parameters.toml, by default the one in configs
+    plot_path : str or Path, optional
+        Path to plot_parameters.toml, by default the one in configs
+    surface_path : str or Path, optional
+        Path to surface_parameters.toml, by default the one in configs. None for no surfaces.
+    economics_path : str or Path, optional
+        Path to economics_parameters.toml, by default the one in configs. None for no economics.
+
+    Returns
+    -------
+    ScenarioPlan
+        The compiled plan
+
+    Raises
+    ------
+    ValueError
+        If the configuration is invalid, listing every problem found
+    """
+    return compile_parameters(
+        load_parameters(performance_path),
+        load_parameters(changing_path),
+        load_parameters(plot_path),
+        load_parameters(surface_path) if surface_path is not None else None,
+        load_parameters(economics_path) if economics_path is not None else None,
+    )
+
+
+def save_plan(plan, filepath):
+    """
+    Write a plan to a JSON file.
+
+    Parameters
+    ----------
+    plan : ScenarioPlan
+        The plan to save
+    filepath : str or Path
+        Path of the JSON file
+    """
+    with open(filepath, "w") as file:
+        json.dump(plan.to_dict(), file, indent=2)
+
+
+def load_plan(filepath):
+    """
+    Read a plan written by save_plan.
+
+    Parameters
+    ----------
+    filepath : str or Path
+        Path of the JSON file
+
+    Returns
+    -------
+    ScenarioPlan
+        The restored plan
+    """
+    with open(filepath, "r") as file:
+        return plan_from_dict(json.load(file))
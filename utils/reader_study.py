@@ -0,0 +1,54 @@
+"""Load per-case reader-study data."""
+
+import warnings
+import numpy as np
+from pathlib import Path
+
+
+# Columns of a reader-study file, each holding 0 or 1 per case
+READER_STUDY_COLUMNS = ("cancer", "ai_positive", "abbr_positive")
+
+
+def load_reader_study(filepath):
+    """
+    Load per-case reader-study and AI outputs from a CSV file.
+
+    The file has a header row and one row per case, with at least the columns:
+    'cancer' (1 if the case has cancer), 'ai_positive' (1 if the AI model flags the case)
+    and 'abbr_positive' (1 if the radiologist recalls the case on the abbreviated protocol).
+    Other columns are ignored.
+
+    Parameters
+    ----------
+    filepath : str or Path
+        Path to the CSV file
+
+    Returns
+    -------
+    dict
+        Dictionary with a boolean array per column in READER_STUDY_COLUMNS
+
+    Raises
+    ------
+    ValueError
+        If the file has no cases, or a column is missing or holds values other than 0 and 1
+    """
+    with open(Path(filepath), "r") as file:
+        header = [name.strip() for name in file.readline().split(",")]
+        for column in READER_STUDY_COLUMNS:
+            if column not in header:
+                raise ValueError(f"Reader study {filepath} has no column '{column}'")
+        usecols = [header.index(column) for column in READER_STUDY_COLUMNS]
+        # An empty file is reported below, instead of as a loadtxt warning
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", UserWarning)
+            values = np.loadtxt(file, delimiter=",", ndmin=2, usecols=usecols)
+    if not len(values):
+        raise ValueError(f"Reader study {filepath} has no cases")
+
+    cases = {}
+    for index, column in enumerate(READER_STUDY_COLUMNS):
+        if not np.isin(values[:, index], (0, 1)).all():
+            raise ValueError(f"Column '{column}' of reader study {filepath} must only contain 0 and 1")
+        cases[column] = values[:, index] == 1
+    return cases
@@ -0,0 +1,145 @@
+"""Store sweep results on disk chunk by chunk, and read them back the same way."""
+
+import json
+import numpy as np
+from pathlib import Path
+
+
+METADATA_NAME = "metadata.json"
+
+
+def store_chunks(stream, store_dir, changing_param, metadata=None):
+    """
+    Write every chunk of a sweep to a result store and pass it on.
+
+    A result store is a directory containing one raw binary file per key and a
+    metadata.json file with the changing parameter, the dtype of every key, the
+    number of stored sweep steps and whether the sweep was stored completely. When the
+    consumer stops early or the stream raises, the metadata is still written but marks
+    the store as incomplete, so open_result_store rejects it.
+
+    Parameters
+    ----------
+    stream : iterator of dict
+        Sweep chunks, e.g. from calculations.sweep.iter_sweep
+    store_dir : Path or str
+        Directory of the result store, created if it does not exist
+    changing_param : str
+        Name of the parameter being varied in the sweep
+    metadata : dict, optional
+        Additional JSON-serializable information to store, e.g. the performance parameters
+
+    Yields
+    ------
+    dict
+        The unchanged sweep chunks
+    """
+    store_path = Path(store_dir)
+    store_path.mkdir(parents=True, exist_ok=True)
+    (store_path / METADATA_NAME).unlink(missing_ok=True)
+    files = {}
+    dtypes = {}
+    length = 0
+    complete = False
+    try:
+        for chunk in stream:
+            for key, values in chunk.items():
+                values = np.ascontiguousarray(values)
+                if key not in files:
+                    files[key] = open(store_path / f"{key}.bin", "wb")
+                    dtypes[key] = values.dtype.str
+                files[key].write(values.astype(dtypes[key], copy=False).tobytes())
+            length += len(next(iter(chunk.values())))
+            yield chunk
+        complete = True
+    finally:
+        for file in files.values():
+            file.close()
+        info = {
+            "changing_param": changing_param,
+            "length": length,
+            "dtypes": dtypes,
+            "complete": complete,
+            "metadata": metadata or {},
+        }
+        with open(store_path / METADATA_NAME, "w") as file:
+            json.dump(info, file, indent=2)
+
+
+def write_result_store(stream, store_dir, changing_param, metadata=None):
+    """
+    Write a complete sweep to a result store.
+
+    Parameters
+    ----------
+    stream : iterator of dict
+        Sweep chunks, e.g. from calculations.sweep.iter_sweep
+    store_dir : Path or str
+        Directory of the result store, created if it does not exist
+    changing_param : str
+        Name of the parameter being varied in the sweep
+    metadata : dict, optional
+        Additional JSON-serializable information to store
+
+    Returns
+    -------
+    None
+        The results are written to store_dir
+    """
+    for _ in store_chunks(stream, store_dir, changing_param, metadata):
+        pass
+
+
+def open_result_store(store_dir):
+    """
+    Open a result store without loading it into memory.
+
+    Parameters
+    ----------
+    store_dir : Path or str
+        Directory of the result store
+
+    Returns
+    -------
+    tuple
+        (data, info): data maps every key to a read-only memory-mapped array, and info is
+        the content of metadata.json
+
+    Raises
+    ------
+    ValueError
+        If the sweep was not stored completely, e.g. because writing it was interrupted
+    """
+    store_path = Path(store_dir)
+    with open(store_path / METADATA_NAME, "r") as file:
+        info = json.load(file)
+    if not info.get("complete"):
+        raise ValueError(f"Result store '{store_path}' is incomplete: only {info['length']} sweep steps were written")
+    data = {}
+    for key, dtype in info["dtypes"].items():
+        if info["length"]:
+            data[key] = np.memmap(store_path / f"{key}.bin", dtype=dtype, mode="r", shape=(info["length"],))
+        else:
+            data[key] = np.empty(0, dtype=dtype)
+    return data, info
+
+
+def iter_result_store(store_dir, chunk_size=2**16):
+    """
+    Read a result store chunk by chunk.
+
+    Parameters
+    ----------
+    store_dir : Path or str
+        Directory of the result store
+    chunk_size : int, optional
+        Maximum number of sweep steps per chunk, by default 2**16
+
+    Yields
+    ------
+    dict
+        Consecutive chunks of the stored sweep, as arrays in memory
+    """
+    data, info = open_result_store(store_dir)
+    for first in range(0, info["length"], chunk_size):
+        yield {key: np.array(values[first : first + chunk_size]) for key, values in data.items()}
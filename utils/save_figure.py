@@ -1,9 +1,75 @@
+import io
 import matplotlib.pyplot as plt
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from matplotlib.collections import PolyCollection
 from pathlib import Path
 from utils.paths import PROJECT_ROOT
 
 
-def save_and_close_figure(fig, save_name, save_dir=PROJECT_ROOT):
+# Formats written as vector graphics, in which dense bands can be rasterized
+VECTOR_FORMATS = ("pdf", "svg", "eps", "ps")
+
+
+def _as_formats(formats):
+    """Return formats as a list, accepting a single format string."""
+    if isinstance(formats, str):
+        return [formats]
+    return list(formats)
+
+
+def _rasterize_bands(fig):
+    """Rasterize the filled bands (e.g. from fill_between) of every axis in the figure."""
+    for ax in fig.axes:
+        for collection in ax.collections:
+            if isinstance(collection, PolyCollection):
+                collection.set_rasterized(True)
+
+
+def render_figure(fig, formats, dpi=None, rasterize_bands=False):
+    """
+    Render the given matplotlib figure in one or more formats and resolutions.
+
+    Parameters
+    ----------
+    fig : matplotlib.figure.Figure
+        The matplotlib figure to be rendered
+    formats : str or list of str
+        File format(s) to render, e.g. 'png' or ['png', 'pdf', 'svg']
+    dpi : float or list of float, optional
+        Resolution(s) of raster output, by default the figure dpi. Raster formats are
+        rendered once per resolution, vector formats once with the highest resolution
+        for their rasterized parts.
+    rasterize_bands : bool, optional
+        If True, filled bands are rasterized in vector formats, by default False.
+        This keeps PDF and SVG files of long sweeps small and fast to open.
+
+    Returns
+    -------
+    dict
+        Dictionary mapping (format, dpi) to the rendered file content in bytes
+    """
+    formats = _as_formats(formats)
+    dpis = [dpi] if dpi is None or np.isscalar(dpi) else list(dpi)
+    if rasterize_bands and any(fmt in VECTOR_FORMATS for fmt in formats):
+        _rasterize_bands(fig)
+
+    rendered = {}
+    for fmt in formats:
+        fmt_dpis = [None if None in dpis else max(dpis)] if fmt in VECTOR_FORMATS else dpis
+        for fmt_dpi in fmt_dpis:
+            buffer = io.BytesIO()
+            fig.savefig(buffer, format=fmt, dpi=fmt_dpi or "figure")
+            rendered[(fmt, fmt_dpi)] = buffer.getvalue()
+    return rendered
+
+
+def _write_file(save_path, content):
+    save_path.parent.mkdir(parents=True, exist_ok=True)  # Ensure directory exists
+    save_path.write_bytes(content)
+
+
+def save_and_close_figure(fig, save_name, save_dir=PROJECT_ROOT, formats=None, dpi=None, rasterize_bands=False):
     """
     Save the given matplotlib figure to the specified path and close it.
 
@@ -12,17 +78,76 @@ def save_and_close_figure(fig, save_name, save_dir=PROJECT_ROOT):
     fig : matplotlib.figure.Figure
         The matplotlib figure to be saved
     save_name : str
-        The name of the file to save the figure as
+        The name of the file to save the figure as. If formats is given,
+        the extension of every file is set to its format.
     save_dir : Path or str, optional
         The directory where the figure will be saved,
         by default PROJECT_ROOT
+    formats : str or list of str, optional
+        File format(s) to save, by default the format given by the extension of save_name
+    dpi : float or list of float, optional
+        Resolution(s) of raster output, by default the figure dpi
+    rasterize_bands : bool, optional
+        If True, filled bands are rasterized in vector formats, by default False
 
     Returns
     -------
     None
         The figure is saved to disk and closed
     """
-    save_path = Path(save_dir) / save_name
-    save_path.parent.mkdir(parents=True, exist_ok=True)  # Ensure directory exists
-    fig.savefig(str(save_path))  # Convert to string for matplotlib compatibility
-    plt.close(fig)
+    save_and_close_figures(
+        [{"fig": fig, "name": save_name}], save_dir, formats=formats, dpi=dpi, rasterize_bands=rasterize_bands
+    )
+
+
+def save_and_close_figures(fig_list, save_dir=PROJECT_ROOT, formats=None, dpi=None, rasterize_bands=False, workers=1):
+    """
+    Save a list of matplotlib figures in one or more formats and close them.
+
+    Every figure is rendered once per format, in the calling thread. Writing the rendered
+    files to disk is done by a pool of worker threads, so it overlaps with rendering.
+
+    Parameters
+    ----------
+    fig_list : list of dict
+        Figures to save, as dictionaries containing:
+        'fig' : matplotlib.figure.Figure
+            The matplotlib figure to be saved
+        'name' : str
+            The name of the file to save the figure as
+    save_dir : Path or str, optional
+        The directory where the figures will be saved,
+        by default PROJECT_ROOT
+    formats : str or list of str, optional
+        File format(s) to save, by default the format given by the extension of each name
+    dpi : float or list of float, optional
+        Resolution(s) of raster output, by default the figure dpi. With several resolutions,
+        raster files are named '<name>_<dpi>dpi.<format>'.
+    rasterize_bands : bool, optional
+        If True, filled bands are rasterized in vector formats, by default False
+    workers : int, optional
+        Number of threads writing files to disk, by default 1
+
+    Returns
+    -------
+    None
+        The figures are saved to disk and closed
+    """
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = []
+        for fig_dict in fig_list:
+            fig = fig_dict["fig"]
+            save_path = Path(save_dir) / fig_dict["name"]
+            fig_formats = _as_formats(formats) if formats else [save_path.suffix.lstrip(".") or "png"]
+            rendered = render_figure(fig, fig_formats, dpi=dpi, rasterize_bands=rasterize_bands)
+            plt.close(fig)
+            raster_dpis = {fmt_dpi for (fmt, fmt_dpi) in rendered if fmt not in VECTOR_FORMATS}
+            for (fmt, fmt_dpi), content in rendered.items():
+                file_path = save_path.with_suffix(f".{fmt}")
+                # Tell raster files apart by their resolution when several are requested
+                if fmt not in VECTOR_FORMATS and len(raster_dpis) > 1:
+                    file_path = file_path.with_stem(f"{file_path.stem}_{fmt_dpi:g}dpi")
+                futures.append(executor.submit(_write_file, file_path, content))
+        # Raise the first error that occurred while writing
+        for future in futures:
+            future.result()
@@ -0,0 +1,33 @@
+"""Write per-site summaries as CSV tables."""
+
+import csv
+from pathlib import Path
+
+
+def write_site_table(filepath, names, table):
+    """
+    Write one row per site and one column per key of a summary table.
+
+    Parameters
+    ----------
+    filepath : str or Path
+        Path of the CSV file, its directory is created if it does not exist
+    names : list of str
+        Site names, written to the 'site' column
+    table : dict
+        Dictionary with one array of len(names) values per column,
+        e.g. from calculations.economics.site_summary
+
+    Returns
+    -------
+    Path
+        Path of the written file
+    """
+    path = Path(filepath)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(["site"] + list(table))
+        for index, name in enumerate(names):
+            writer.writerow([name] + [f"{float(values[index]):.6g}" for values in table.values()])
+    return path